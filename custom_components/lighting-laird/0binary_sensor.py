@@ -21,31 +21,35 @@ async def async_setup_entry(
     """
 
     @callback
-    def _create_entity(device, metric):
-        """Create platform specific entities."""
-        entities = []
+    def _create_entities(device, metrics):
+        """Create platform specific entities for the new metrics of a telegram."""
+        entities = [
+            BoolEntity(device, metric, config_entry)
+            for metric in metrics
+            if metric.is_bool
+        ]
 
-        if metric.is_bool:
-            entities.append(BoolEntity(device, metric, config_entry.options))
+        if entities:
+            async_add_entities(entities)
 
-        async_add_entities(entities)
-
-    async_dispatcher_connect(hass, CREATE_ENTITY_SIGNAL, _create_entity)
+    config_entry.async_on_unload(
+        async_dispatcher_connect(hass, CREATE_ENTITY_SIGNAL, _create_entities)
+    )
 
 
 class BoolEntity(WiffiEntity, BinarySensorEntity):
     """Entity for wiffi metrics which have a boolean value."""
 
-    def __init__(self, device, metric, options):
+    def __init__(self, device, metric, config_entry):
         """Initialize the entity."""
-        super().__init__(device, metric, options)
+        super().__init__(device, metric, config_entry)
         self._attr_is_on = metric.value
         self.reset_expiration_date()
 
     @property
     def available(self):
         """Return true if value is valid."""
-        return self._attr_is_on is not None
+        return self._attr_available and self._attr_is_on is not None
 
     @callback
     def _update_value_callback(self, device, metric):
@@ -1,191 +1,326 @@
 """Component for wiffi support."""
 import asyncio
-from datetime import timedelta
-import errno
-import json
+from functools import partial
 import logging
+import time
+
+import voluptuous as vol
+from websockets.exceptions import WebSocketException
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_IP_ADDRESS, CONF_TIMEOUT, Platform
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers import device_registry as dr
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    CONF_IP_ADDRESS,
+    CONF_NAME,
+    CONF_TIMEOUT,
+    Platform,
+)
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import (
+    ConfigEntryNotReady,
+    HomeAssistantError,
+    ServiceValidationError,
+)
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_registry as er,
+)
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.dispatcher import (
     async_dispatcher_connect,
     async_dispatcher_send,
 )
 from homeassistant.helpers.entity import Entity
-from homeassistant.helpers.event import async_track_time_interval
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-from homeassistant.util.dt import utcnow
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.typing import ConfigType
 
+from .binding import bindings_from_options
+from .cache import LightingLairdInventoryCache
 from .const import (
-    CHECK_ENTITIES_SIGNAL,
+    ATTR_LIGHTS,
+    BINDING_ACTION_OFF,
+    BINDING_ACTION_ON,
+    BINDING_ACTION_TOGGLE,
+    CONF_BATCH_WINDOW,
+    CONF_BRIGHTNESS_RATE,
+    CONF_FIRE_EVENTS,
+    CONF_OPTIMISTIC,
+    CONF_POLL_SILENCE,
     CREATE_ENTITY_SIGNAL,
+    DEFAULT_BATCH_WINDOW,
+    DEFAULT_BRIGHTNESS_RATE,
+    DEFAULT_FIRE_EVENTS,
+    DEFAULT_OPTIMISTIC,
+    DEFAULT_POLL_SILENCE,
     DEFAULT_TIMEOUT,
     DOMAIN,
+    EVENT_BRIGHTNESS,
+    EVENT_BUTTON,
+    FULL_BRIGHTNESS,
+    OPTIMISTIC_TIMEOUT,
+    SERVICE_APPLY_SCENE,
+    SERVICE_CREATE_SCENE,
     UPDATE_ENTITY_SIGNAL,
 )
-from .lairdserver import LightingLairdWebSocketServer
+from .coordinator import LightingLairdCoordinator
+from .expiration import async_get_expirations
+from .hub import async_get_hub_manager
+from .lairdserver import PRIORITY_REFRESH, CommandQueueFull
 from .models import LightingLairdData
+from .protocol import (
+    FRAME_BRIGHTNESS,
+    FRAME_BUTTON,
+    FRAME_BUTTON_DATA,
+    FRAME_LAMP_DATA,
+    ProtocolError,
+    decode_buttons,
+    decode_lamps,
+)
+from .scene_store import LightingLairdSceneStore
+from .store import InventoryChanges, LightingLairdStateStore
+from .transition import async_get_transitions
 
 _LOGGER = logging.getLogger(__name__)
 
 
-PLATFORMS = [Platform.BINARY_SENSOR, Platform.LIGHT]
+PLATFORMS = [Platform.BINARY_SENSOR, Platform.LIGHT, Platform.SCENE, Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up wiffi from a config entry, config_entry contains data from config entry database."""
-    if not entry.update_listeners:
-        entry.add_update_listener(async_update_options)
+CREATE_SCENE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+    }
+)
 
-    @callback
-    def plex_websocket_callback(msgtype, data, error):
-        _LOGGER.info(f"websocket message received {msgtype}")
+APPLY_SCENE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_LIGHTS): {
+            cv.entity_id: vol.All(vol.Coerce(int), vol.Range(min=0, max=255))
+        },
+    }
+)
 
-    # create api object
-    api = LightingLairdIntegrationApi(hass, plex_websocket_callback)
-    api.async_setup(entry)
 
-    async def async_get():
-        # global latestLampData
-        # if latestLampData is None:
-        latestLampData = {}
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Register the scene services of the integration."""
+
+    async def async_create_scene(call: ServiceCall) -> None:
+        """Capture the current brightness of lamps as a scene."""
+        lamps = _async_lamps_by_entry(hass, call.data[ATTR_ENTITY_ID])
+        for entry_id, lampIds in lamps.items():
+            instance: LightingLairdData = hass.data[DOMAIN][entry_id]
+            store = instance.api.store
+            instance.scenes.async_create(
+                call.data[CONF_NAME],
+                {lampId: store.lamp_brightness(lampId) for lampId in lampIds},
+            )
 
+    async def async_apply_scene(call: ServiceCall) -> None:
+        """Apply brightness levels of lamps as one batch per hub."""
+        levels = call.data[ATTR_LIGHTS]
+        lamps = _async_lamps_by_entry(hass, levels)
         try:
-            lampData = await api.getAllLamps()
-            buttonData = await api.getAllButtons()
-            if lampData is not None:
-                lampData = lampData[8:]
-                latestLampData["Lamps"] = json.loads(lampData)
-            if buttonData is not None:
-                buttonData = buttonData[10:]
-                latestLampData["Buttons"] = json.loads(buttonData)
-
-            if "Lamps" in latestLampData and "Buttons" in latestLampData:
-                return latestLampData
-            else:
-                print(
-                    f"Failed to update buttons and lamps on LightingLaird: Lamps:{lampData} Buttons:{buttonData}"
+            await asyncio.gather(
+                *(
+                    hass.data[DOMAIN][entry_id].api.async_apply_levels(
+                        {
+                            lampId: min(levels[entity_id], FULL_BRIGHTNESS)
+                            for entity_id, lampId in lampIds.items()
+                        }
+                    )
+                    for entry_id, lampIds in lamps.items()
                 )
-
-            return coordinator.data
+            )
         except OSError as err:
-            raise Exception(err) from err
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name="Lighting Laird",
-        update_method=async_get,
-        update_interval=timedelta(seconds=60),
+            raise HomeAssistantError(err) from err
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_CREATE_SCENE, async_create_scene, schema=CREATE_SCENE_SCHEMA
     )
+    hass.services.async_register(
+        DOMAIN, SERVICE_APPLY_SCENE, async_apply_scene, schema=APPLY_SCENE_SCHEMA
+    )
+    return True
 
-    # store api object
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = LightingLairdData(
-        coordinator, api
+
+@callback
+def _async_lamps_by_entry(hass, entity_ids):
+    """Return the lamp ids of light entities grouped by config entry.
+
+    The lamps of an entry are returned as a dict of entity id to lamp id.
+    Raises ServiceValidationError for entities which are no known lamps.
+    """
+    registry = er.async_get(hass)
+    lamps = {}
+    for entity_id in entity_ids:
+        entry = registry.async_get(entity_id)
+        if (
+            entry is None
+            or entry.platform != DOMAIN
+            or entry.config_entry_id not in hass.data.get(DOMAIN, {})
+            or not entry.unique_id.startswith(f"{entry.config_entry_id}-LairdLamp-")
+        ):
+            raise ServiceValidationError(f"{entity_id} is not a Lighting Laird lamp")
+        lampId = int(entry.unique_id.rpartition("-")[2])
+        if not hass.data[DOMAIN][entry.config_entry_id].api.store.has_lamp(lampId):
+            raise ServiceValidationError(f"{entity_id} is not reported by the hub")
+        lamps.setdefault(entry.config_entry_id, {})[entity_id] = lampId
+    return lamps
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate an old config entry."""
+    if entry.version == 1 and entry.minor_version < 2:
+        # namespace unique ids and device identifiers by hub
+        prefix = f"{entry.entry_id}-"
+        local_ids = ("LairdLamp-", "LairdButton-", "LairdHub-", "LairdScene-")
+
+        @callback
+        def _migrate_unique_id(entity_entry: er.RegistryEntry):
+            if entity_entry.unique_id.startswith(local_ids):
+                return {"new_unique_id": prefix + entity_entry.unique_id}
+            return None
+
+        await er.async_migrate_entries(hass, entry.entry_id, _migrate_unique_id)
+
+        device_registry = dr.async_get(hass)
+        for device in dr.async_entries_for_config_entry(
+            device_registry, entry.entry_id
+        ):
+            identifiers = set()
+            for domain, identifier in device.identifiers:
+                if domain == DOMAIN and identifier == "LairdHub":
+                    identifier = entry.entry_id
+                elif domain == DOMAIN and identifier.startswith(local_ids):
+                    identifier = prefix + identifier
+                identifiers.add((domain, identifier))
+            if identifiers != device.identifiers:
+                device_registry.async_update_device(
+                    device.id, new_identifiers=identifiers
+                )
+
+        hass.config_entries.async_update_entry(entry, minor_version=2)
+        _LOGGER.debug("Migrated %s to version 1.2", entry.title)
+
+    return True
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up wiffi from a config entry, config_entry contains data from config entry database."""
+    if not entry.update_listeners:
+        entry.add_update_listener(async_update_options)
+
+    manager = async_get_hub_manager(hass)
+    hub = manager.async_acquire(entry.data[CONF_IP_ADDRESS])
+
+    # create api object
+    api = LightingLairdIntegrationApi(hass)
+    api.async_setup(entry, hub)
+
+    dr.async_get(hass).async_get_or_create(
+        config_entry_id=entry.entry_id,
+        identifiers={(DOMAIN, api.hub_id)},
+        manufacturer="Laird",
+        name=f"Lighting Laird Hub {entry.title}",
+        configuration_url=f"http://{hub.host}",
     )
 
-    async def readWebSockMessages(webSocket):
-        while True:
-            if api.server.server is None:
-                await asyncio.sleep(5)
-                continue
-            try:
-                async for message in api.server.server:
-                    _LOGGER.debug("client got %s", message)
-                    msgArgs = message.split(" ")
-                    if len(msgArgs) > 0 and msgArgs[0] == "bl":  # brightness level
-                        lampId = int(msgArgs[1])
-                        lampBrightness = int(msgArgs[2])
-                        event_data = {
-                            "lampId": lampId,
-                            "brightness": lampBrightness,
-                        }
-                        hass.bus.async_fire("laird-brightness", event_data)
-                    elif len(msgArgs) > 0 and msgArgs[0] == "bs":  # button state
-                        buttonId = int(msgArgs[1])
-                        buttonState = int(msgArgs[2])
-                        event_data = {"buttonId": buttonId, "state": buttonState}
-                        hass.bus.async_fire("laird-button", event_data)
-                    elif len(msgArgs) > 0 and msgArgs[0] == "lampData":
-                        lampJson = message[8:]
-                        coordinator.data["Lamps"] = json.loads(lampJson)
-                        coordinator.async_set_updated_data(coordinator.data)
-                    elif len(msgArgs) > 0 and msgArgs[0] == "buttonData":
-                        buttonJson = message[10:]
-                        coordinator.data["Buttons"] = json.loads(buttonJson)
-                        coordinator.async_set_updated_data(coordinator.data)
-            except Exception as err:
-                _LOGGER.warning("Lighting Laird WebSocket connection lost: %s", err)
-
-            # Connection ended (closed or error) — attempt reconnection
-            _LOGGER.info("Reconnecting to Lighting Laird Hub...")
-            api.server.server = None
-            while True:
-                try:
-                    await asyncio.wait_for(api.server.start_server(), timeout=5)
-                    _LOGGER.info("Reconnected to Lighting Laird Hub")
-                    break
-                except (
-                    asyncio.TimeoutError,
-                    ConnectionRefusedError,
-                    OSError,
-                ) as err:
-                    _LOGGER.warning(
-                        "Reconnection failed: %s. Retrying in 5 seconds...", err
-                    )
-                    await asyncio.sleep(5)
-                except Exception as err:
-                    _LOGGER.warning(
-                        "Unexpected error during reconnection: %s. Retrying in 5 seconds...",
-                        err,
-                    )
-                    await asyncio.sleep(5)
+    coordinator = LightingLairdCoordinator(hass, api)
+    api.coordinator = coordinator
+    api.async_apply_options(entry.options)
+    api.cache = LightingLairdInventoryCache(hass, entry.entry_id, api.store)
 
-    try:
-        await asyncio.wait_for(api.server.start_server(), timeout=5)
+    scenes = LightingLairdSceneStore(hass, entry.entry_id)
+    await scenes.async_load()
 
-    except OSError as exc:
-        if exc.errno != errno.EADDRINUSE:
-            _LOGGER.error("Start_server failed, errno: %d", exc.errno)
-            return False
-        _LOGGER.error("Port %s already in use", entry.data[CONF_PORT])
-        raise ConfigEntryNotReady from exc
+    async def async_connect():
+        """Connect to the hub and download the first snapshot in the background.
 
-    await coordinator.async_config_entry_first_refresh()
+        If the hub can't be reached the reader keeps reconnecting, the
+        entities created from the cache stay unavailable until then.
+        """
+        try:
+            await hub.async_connect()
+        except (OSError, WebSocketException) as err:
+            _LOGGER.warning("Lighting Laird Hub not reachable yet: %s", err)
+        hub.async_start_reader()
+        if hub.connected:
+            coordinator.async_request_resync()
+            await coordinator.async_refresh()
 
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = LightingLairdData(coordinator, api)
+    if (inventory := hub.inventory) is not None:
+        # reuse the inventory the config flow has just downloaded
+        hub.inventory = None
+        api.async_apply_snapshot(*inventory)
+        api.cache.async_schedule_save()
+        coordinator.async_set_updated_data(api.store)
+        hub.async_start_reader()
+    elif await api.cache.async_load():
+        # create the entities from the cache, the live snapshot follows
+        coordinator.async_set_cached_data(api.store)
+        entry.async_create_background_task(
+            hass, async_connect(), f"{DOMAIN} connect {entry.entry_id}"
+        )
+    else:
+        try:
+            await hub.async_connect()
+            await coordinator.async_config_entry_first_refresh()
+        except (OSError, WebSocketException) as exc:
+            api.shutdown()
+            await manager.async_release(hub)
+            raise ConfigEntryNotReady(
+                f"Lighting Laird Hub {hub.host} not reachable: {exc}"
+            ) from exc
+        except ConfigEntryNotReady:
+            api.shutdown()
+            await manager.async_release(hub)
+            raise
+        hub.async_start_reader()
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # store api object
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = LightingLairdData(
+        coordinator, api, scenes
+    )
 
-    await api.server.disable_recv()
-    hass.async_create_task(readWebSockMessages(api.server.server))
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Update options."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Apply changed options to the running entry.
+
+    Only a new hub address needs a reload, everything else is applied live
+    so the connection and the entities stay up.
+    """
+    if (instance := hass.data.get(DOMAIN, {}).get(entry.entry_id)) is None:
+        return
+    if entry.data[CONF_IP_ADDRESS] != instance.api.hub.host:
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    instance.api.async_apply_options(entry.options)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    instance: LightingLairdData = hass.data[DOMAIN][entry.entry_id]
-    await instance.api.server.close_server()
-
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        api = hass.data[DOMAIN].pop(entry.entry_id)
-    # api.shutdown()
+        instance: LightingLairdData = hass.data[DOMAIN].pop(entry.entry_id)
+        instance.api.shutdown()
+        await async_get_hub_manager(hass).async_release(instance.api.hub)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the inventory cache and scenes of a deleted config entry."""
+    await LightingLairdInventoryCache(hass, entry.entry_id).async_remove()
+    await LightingLairdSceneStore(hass, entry.entry_id).async_remove()
+
+
 def generate_unique_id(device, metric):
     """Generate a unique string for the entity."""
     return f"{device.mac_address.replace(':', '')}-{metric.name}"
@@ -194,93 +329,699 @@ def generate_unique_id(device, metric):
 class LightingLairdIntegrationApi:
     """API object for wiffi handling. Stored in hass.data."""
 
-    coordinator: DataUpdateCoordinator
+    coordinator: LightingLairdCoordinator
 
-    def __init__(self, hass, websocketCallback):
+    def __init__(self, hass):
         """Initialize the instance."""
         self._hass = hass
         self._server = None
         self._known_devices = {}
-        self._periodic_callback = None
-        self._websocketCallback = websocketCallback
+        self._remove_handlers = []
+        self.hub = None
+        self.hub_id = None
+        self._lamp_listeners = {}
+        self._button_listeners = {}
+        self._lamp_add_listener = None
+        self._button_add_listener = None
+        self._fire_events = DEFAULT_FIRE_EVENTS
+        self._batch_window = DEFAULT_BATCH_WINDOW
+        self._batch = []
+        self._batch_handle = None
+        self._brightness_rate = DEFAULT_BRIGHTNESS_RATE
+        self._brightness_targets = {}
+        self._brightness_pending = {}
+        self._brightness_writers = set()
+        self._optimistic_mode = DEFAULT_OPTIMISTIC
+        self._optimistic = {}
+        self._held_lamps = {}
+        self._ramp_targets = {}
+        self._transitions = None
+        self._bindings = {}
+        self.store = LightingLairdStateStore()
+        self.cache = None
+        self._cache_dirty = False
+        self._snapshot_requests = {}
+        self.snapshot_changes = 0
         _LOGGER.info("laird lighting init")
 
-    def async_setup(self, config_entry):
-        """Set up api instance."""
+    def async_setup(self, config_entry, hub):
+        """Set up api instance on the shared connection of the hub session."""
         _LOGGER.info("laird lighting setup")
-        self._server = LightingLairdWebSocketServer(
-            host=config_entry.data[CONF_IP_ADDRESS], callback=self._websocketCallback
+        self.hub = hub
+        self.hub_id = config_entry.entry_id
+        self._server = hub.server
+        self._transitions = async_get_transitions(self._hass)
+        self._remove_handlers = [
+            self._server.add_frame_handler(self.async_handle_frame),
+        ]
+
+    @callback
+    def async_apply_options(self, options):
+        """Apply the options of the config entry to the running objects.
+
+        Every option is read where it is used, so changes take effect with
+        the next event, command or refresh without reconnecting.
+        """
+        self._fire_events = options.get(CONF_FIRE_EVENTS, DEFAULT_FIRE_EVENTS)
+        self._batch_window = options.get(CONF_BATCH_WINDOW, DEFAULT_BATCH_WINDOW)
+        self._brightness_rate = options.get(
+            CONF_BRIGHTNESS_RATE, DEFAULT_BRIGHTNESS_RATE
         )
-        self._periodic_callback = async_track_time_interval(
-            self._hass, self._periodic_tick, timedelta(seconds=10)
+        self._optimistic_mode = options.get(CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC)
+        self._bindings = bindings_from_options(options)
+        self.coordinator.poll_silence = options.get(
+            CONF_POLL_SILENCE, DEFAULT_POLL_SILENCE
+        )
+
+    @property
+    def hub_device_info(self):
+        """Return the device info of the hub, the parent of all devices."""
+        return DeviceInfo(identifiers={(DOMAIN, self.hub_id)})
+
+    @callback
+    def async_handle_frame(self, frame, resolved):
+        """Process a frame read from the hub by the reader of the connection.
+
+        resolved is True if the frame answered a pending request. Snapshots
+        are applied unless the coordinator of this API is waiting for them,
+        so a snapshot requested by another entry of the hub or by a resync
+        reaches the state store as well.
+        """
+        frameType = frame[0]
+        if frameType == FRAME_BRIGHTNESS:
+            self.async_lamp_brightness(frame[1], frame[2])
+        elif frameType == FRAME_BUTTON:
+            self.async_button_state(frame[1], frame[2])
+        elif resolved and self._snapshot_requests.get(frameType):
+            # snapshot is handled by the waiting coordinator refresh
+            return
+        elif frameType == FRAME_LAMP_DATA:
+            try:
+                lamps = decode_lamps(frame[2])
+            except ProtocolError as err:
+                _LOGGER.warning("Ignoring lamp snapshot: %s", err)
+                return
+            changed = self.async_apply_snapshot(lamps=lamps)
+            if changed or not self.coordinator.last_update_success:
+                self.coordinator.async_set_updated_data(self.store)
+        elif frameType == FRAME_BUTTON_DATA:
+            try:
+                buttons = decode_buttons(frame[2])
+            except ProtocolError as err:
+                _LOGGER.warning("Ignoring button snapshot: %s", err)
+                return
+            changed = self.async_apply_snapshot(buttons=buttons)
+            if changed or not self.coordinator.last_update_success:
+                self.coordinator.async_set_updated_data(self.store)
+
+    @callback
+    def async_register_lamp(self, lampId, update_callback):
+        """Register the entity callback for brightness pushes of a lamp.
+
+        Returns a function which removes the registration again.
+        """
+        return self._async_register(self._lamp_listeners, lampId, update_callback)
+
+    @callback
+    def async_register_button(self, buttonId, update_callback):
+        """Register the entity callback for state pushes of a button.
+
+        Returns a function which removes the registration again.
+        """
+        return self._async_register(
+            self._button_listeners, buttonId, update_callback
+        )
+
+    @callback
+    def _async_register(self, listeners, key, update_callback):
+        """Add update_callback to the routing table listeners under key."""
+        listeners[key] = update_callback
+
+        @callback
+        def remove_listener():
+            if listeners.get(key) is update_callback:
+                del listeners[key]
+
+        return remove_listener
+
+    @callback
+    def async_lamp_brightness(self, lampId, brightness):
+        """Route a pushed brightness level to the entity of the lamp."""
+        if self.store.set_lamp_brightness(lampId, brightness):
+            # saved with the next snapshot, not on the hot path of the reader
+            self._cache_dirty = True
+        if (optimistic := self._optimistic.pop(lampId, None)) is not None:
+            # echo confirms the optimistic state
+            optimistic[1]()
+        if not self.store.has_lamp(lampId):
+            # lamp is not known, inventory of the hub has drifted
+            self.coordinator.async_request_resync()
+        elif lampId in self._held_lamps:
+            # written together with the other lamps of the batch
+            pass
+        elif (update_callback := self._lamp_listeners.get(lampId)) is not None:
+            update_callback()
+        if self._fire_events:
+            self._hass.bus.async_fire(
+                EVENT_BRIGHTNESS, {"lampId": lampId, "brightness": brightness}
+            )
+
+    @callback
+    def async_button_state(self, buttonId, state):
+        """Route a pushed button state to the entity of the button.
+
+        The commands of a binding of the button are queued first, so they go
+        out before any entity state is written or event fired.
+        """
+        if state and (binding := self._bindings.get(buttonId)) is not None:
+            self._async_run_binding(binding)
+        if self.store.set_button_state(buttonId, state):
+            # saved with the next snapshot, not on the hot path of the reader
+            self._cache_dirty = True
+        if not self.store.has_button(buttonId):
+            # button is not known, inventory of the hub has drifted
+            self.coordinator.async_request_resync()
+        elif (update_callback := self._button_listeners.get(buttonId)) is not None:
+            update_callback()
+        if self._fire_events:
+            self._hass.bus.async_fire(
+                EVENT_BUTTON, {"buttonId": buttonId, "state": state}
+            )
+
+    @callback
+    def async_apply_snapshot(self, lamps=None, buttons=None):
+        """Apply a lamp and/or button snapshot to the state store.
+
+        Only lamps and buttons whose values changed get a new version in the
+        store, so only their entities write their state. Returns the number
+        of changed lamps and buttons, which is kept in snapshot_changes.
+        The inventory cache is saved if the snapshot or a push since the last
+        snapshot changed anything.
+        """
+        changes = 0
+        lamp_changes = InventoryChanges()
+        button_changes = InventoryChanges()
+        if lamps is not None:
+            changes += len(self.store.apply_lamps(lamps, lamp_changes))
+        if buttons is not None:
+            changes += len(self.store.apply_buttons(buttons.values(), button_changes))
+        self.snapshot_changes = changes
+        _LOGGER.debug("Snapshot changed %d lamps and buttons", changes)
+        if (changes or self._cache_dirty) and self.cache is not None:
+            self._cache_dirty = False
+            self.cache.async_schedule_save()
+        if lamp_changes:
+            self._async_reconcile(
+                Platform.LIGHT,
+                "LairdLamp",
+                lamp_changes,
+                self.store.lamp,
+                self.store.lamp_name,
+                self._lamp_add_listener,
+            )
+        if button_changes:
+            self._async_reconcile(
+                Platform.BINARY_SENSOR,
+                "LairdButton",
+                button_changes,
+                self.store.button,
+                self.store.button_name,
+                self._button_add_listener,
+            )
+        return changes
+
+    @callback
+    def async_set_lamp_add_listener(self, add_listener):
+        """Set the callback of the light platform which adds new lamps."""
+        self._lamp_add_listener = add_listener
+
+    @callback
+    def async_set_button_add_listener(self, add_listener):
+        """Set the callback of the binary sensor platform which adds new buttons."""
+        self._button_add_listener = add_listener
+
+    @callback
+    def _async_reconcile(self, domain, kind, changes, record, name, add_listener):
+        """Bring entities and devices in line with a changed inventory.
+
+        Entities and devices of removed ids are deleted from the registries,
+        devices of renamed ids get the new name and new ids are handed to the
+        platform in one batch. Nothing else is touched, so no reload is
+        needed when lamps or buttons are added to the hub.
+        """
+        ent_reg = er.async_get(self._hass)
+        dev_reg = dr.async_get(self._hass)
+        for key in changes.removed:
+            unique_id = f"{self.hub_id}-{kind}-{key}"
+            if entity_id := ent_reg.async_get_entity_id(domain, DOMAIN, unique_id):
+                ent_reg.async_remove(entity_id)
+            if device := dev_reg.async_get_device(identifiers={(DOMAIN, unique_id)}):
+                dev_reg.async_remove_device(device.id)
+        for key in changes.renamed:
+            unique_id = f"{self.hub_id}-{kind}-{key}"
+            if device := dev_reg.async_get_device(identifiers={(DOMAIN, unique_id)}):
+                dev_reg.async_update_device(device.id, name=name(key))
+        if changes.added and add_listener is not None:
+            add_listener([record(key) for key in changes.added])
+        _LOGGER.debug(
+            "%s inventory: %d added, %d removed, %d renamed",
+            kind,
+            len(changes.added),
+            len(changes.removed),
+            len(changes.renamed),
         )
 
     def async_update_state(self, lampId, state):
-        response = None
+        self._async_cancel_brightness(lampId)
         if state == True:
-            response = self._server.sendMsg(f"turn_on  {lampId}")
+            self._async_set_optimistic(lampId, self.lamp_on_brightness(lampId))
+            return self._async_queue_command(lampId, f"turn_on  {lampId}")
+        self._async_set_optimistic(lampId, 0)
+        return self._async_queue_command(lampId, f"turn_off  {lampId}")
+
+    async def async_apply_levels(self, levels):
+        """Apply the hub brightness of many lamps as one batch, e.g. a scene.
+
+        All commands are sent in one burst. Pushes for these lamps are held
+        back until every command has been acknowledged, then all their
+        entities write their state at once.
+        """
+        futures = []
+        for lampId, brightness in levels.items():
+            self._async_cancel_brightness(lampId)
+            self._async_hold(lampId)
+            msg, brightness = self._level_command(lampId, brightness)
+            self._async_set_optimistic(lampId, brightness)
+            futures.append(self._async_queue_command(lampId, msg))
+        if self._optimistic_mode:
+            self._async_update_lamps(levels)
+
+        try:
+            results = await asyncio.gather(*futures, return_exceptions=True)
+        finally:
+            for lampId in levels:
+                self._async_release(lampId)
+            self._async_update_lamps(levels)
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    @callback
+    def _async_run_binding(self, binding):
+        """Queue the lamp commands of a pressed button binding right away.
+
+        The commands bypass the batch and go straight into the outbound queue
+        of the connection, so they are written by the writer without waiting
+        for the entity, event bus or automation engine. The lamp entities
+        write their state afterwards.
+        """
+        lamps = [lampId for lampId in binding.lamps if self.store.has_lamp(lampId)]
+        action = binding.action
+        if action == BINDING_ACTION_TOGGLE:
+            # like a group, a toggle turns all lamps off if any of them is on
+            action = (
+                BINDING_ACTION_OFF
+                if any(self._lamp_brightness(lampId) for lampId in lamps)
+                else BINDING_ACTION_ON
+            )
+        for lampId in lamps:
+            self._async_cancel_brightness(lampId)
+            if action == BINDING_ACTION_ON:
+                msg = f"turn_on  {lampId}"
+                brightness = self.lamp_on_brightness(lampId)
+            elif action == BINDING_ACTION_OFF:
+                msg = f"turn_off  {lampId}"
+                brightness = 0
+            else:
+                brightness = self._lamp_brightness(lampId) + round(
+                    binding.step * FULL_BRIGHTNESS / 100
+                )
+                msg, brightness = self._level_command(
+                    lampId, min(max(brightness, 0), FULL_BRIGHTNESS)
+                )
+            self._async_set_optimistic(lampId, brightness)
+            try:
+                written = self._server.enqueue_nowait(msg)
+            except CommandQueueFull as err:
+                _LOGGER.warning("Dropping button binding command %s: %s", msg, err)
+                self._async_rollback(lampId)
+                continue
+            written.add_done_callback(partial(self._async_binding_command_done, lampId))
+        self._async_update_lamps(lamps)
+
+    @callback
+    def _async_binding_command_done(self, lampId, future):
+        """Roll back the optimistic state of a binding command which failed."""
+        if not future.cancelled() and (err := future.exception()) is not None:
+            _LOGGER.debug("Button binding command for lamp %s failed: %s", lampId, err)
+            self._async_rollback(lampId)
+
+    def _lamp_brightness(self, lampId):
+        """Return the brightness being written to a lamp, else the last known one."""
+        if (target := self.brightness_target(lampId)) is not None:
+            return target
+        return self.store.lamp_brightness(lampId) if self.store.has_lamp(lampId) else 0
+
+    def _level_command(self, lampId, brightness):
+        """Return the command setting a lamp to brightness and the resulting level."""
+        if not brightness:
+            return f"turn_off  {lampId}", 0
+        if self.store.has_lamp(lampId) and self.store.lamp_dimmable(lampId):
+            # lamps with the dimmable flag set are switched only, see light.py
+            return f"turn_on  {lampId}", self.lamp_on_brightness(lampId)
+        return f"set_brightness  {lampId} {brightness}", brightness
+
+    @callback
+    def async_start_transition(self, lampId, brightness, duration):
+        """Ramp the hub brightness of a lamp to brightness over duration seconds.
+
+        The ramp is stepped by the transition scheduler shared by all hubs.
+        The entity shows the target right away, pushes of the intermediate
+        levels are held back until the ramp ends or is cancelled by a newer
+        command for the lamp.
+        """
+        self._async_cancel_brightness(lampId)
+        start = self.store.lamp_brightness(lampId) if self.store.has_lamp(lampId) else 0
+        self._ramp_targets[lampId] = brightness
+        self._async_hold(lampId)
+        self._transitions.async_start(self, lampId, start, brightness, duration)
+
+    @callback
+    def async_send_ramp_levels(self, levels, finished):
+        """Queue the levels of one scheduler tick, they are sent as one batch.
+
+        The lamps in finished have reached their target, a ramp to 0 ends with
+        turn_off.
+        """
+        for lampId, level in levels.items():
+            if level == 0 and lampId in finished:
+                msg = f"turn_off  {lampId}"
+            else:
+                msg = f"set_brightness  {lampId} {level}"
+            self._async_queue_command(lampId, msg).add_done_callback(
+                self._async_ramp_command_done
+            )
+        for lampId in finished:
+            self._ramp_targets.pop(lampId, None)
+            self._async_set_optimistic(lampId, levels[lampId])
+            self._async_release(lampId)
+        self._async_update_lamps(finished)
+
+    @staticmethod
+    def _async_ramp_command_done(future):
+        """Log a failed ramp command, the next tick or the final echo corrects it."""
+        if not future.cancelled() and (err := future.exception()) is not None:
+            _LOGGER.debug("Transition step failed: %s", err)
+
+    @callback
+    def _async_hold(self, lampId):
+        """Hold back the pushes of a lamp from its entity."""
+        self._held_lamps[lampId] = self._held_lamps.get(lampId, 0) + 1
+
+    @callback
+    def _async_release(self, lampId):
+        """Pass the pushes of a lamp to its entity again."""
+        if self._held_lamps.get(lampId, 0) > 1:
+            self._held_lamps[lampId] -= 1
         else:
-            response = self._server.sendMsg(f"turn_off  {lampId}")
-        return response
+            self._held_lamps.pop(lampId, None)
+
+    @callback
+    def _async_update_lamps(self, lampIds):
+        """Let the entities of lampIds write their state."""
+        for lampId in lampIds:
+            if (update_callback := self._lamp_listeners.get(lampId)) is not None:
+                update_callback()
+
+    @callback
+    def _async_cancel_brightness(self, lampId):
+        """Drop brightness values of a lamp which have not been written yet.
+
+        A newer command supersedes them, their futures are done right away.
+        An active transition of the lamp is cancelled as well.
+        """
+        self._async_cancel_transition(lampId)
+        if (pending := self._brightness_pending.pop(lampId, None)) is not None:
+            for future in pending[1]:
+                if not future.done():
+                    future.set_result(None)
+        self._brightness_targets.pop(lampId, None)
+
+    @callback
+    def _async_cancel_transition(self, lampId):
+        """Stop the transition of a lamp and pass its pushes on again."""
+        if self._ramp_targets.pop(lampId, None) is not None:
+            self._transitions.async_cancel(self, lampId)
+            self._async_release(lampId)
 
     def async_update_value(self, lampId, value):
+        """Write the brightness value (0..100) of a lamp behind.
+
+        Only the latest value of a lamp is kept while a write is in flight and
+        writes are limited to brightness_rate per second, so superseded
+        values of a slider drag are dropped and the final value is always
+        sent. The returned future is done once that value has been sent. A
+        running transition of the lamp is cancelled, so its next steps don't
+        overwrite the value.
+        """
+        self._async_cancel_transition(lampId)
         value = int((value / 100) * 254)
-        response = self._server.sendMsg(f"set_brightness  {lampId} {value}")
-        return response
+        future = self._hass.loop.create_future()
+        _, futures = self._brightness_pending.get(lampId, (None, []))
+        futures.append(future)
+        self._brightness_pending[lampId] = (value, futures)
+        self._brightness_targets[lampId] = value
+        self._async_set_optimistic(lampId, value)
+        if lampId not in self._brightness_writers:
+            self._brightness_writers.add(lampId)
+            self._hass.async_create_task(self._async_write_brightness(lampId))
+        return future
+
+    @callback
+    def brightness_target(self, lampId):
+        """Return the brightness which is being written to a lamp, if any.
 
-    def getAllLamps(self):
-        response = self._server.sendMsg("getAllLamps")
-        return response
+        In optimistic mode this is the commanded brightness until the hub
+        echoes it.
+        """
+        if (target := self._ramp_targets.get(lampId)) is not None:
+            return target
+        if (target := self._brightness_targets.get(lampId)) is not None:
+            return target
+        if (optimistic := self._optimistic.get(lampId)) is not None:
+            return optimistic[0]
+        return None
 
-    def getAllButtons(self):
-        response = self._server.sendMsg("getAllButtons")
-        return response
+    def lamp_on_brightness(self, lampId):
+        """Return the brightness a lamp is expected to have once turned on."""
+        if self.store.has_lamp(lampId) and (
+            brightness := self.store.lamp_brightness(lampId)
+        ):
+            return brightness
+        return FULL_BRIGHTNESS
+
+    @callback
+    def _async_set_optimistic(self, lampId, brightness):
+        """Assume brightness for a lamp until its echo arrives.
+
+        If the hub does not echo the command within OPTIMISTIC_TIMEOUT the
+        assumed state is rolled back and a re-sync is requested.
+        """
+        if not self._optimistic_mode:
+            return
+        if (optimistic := self._optimistic.pop(lampId, None)) is not None:
+            optimistic[1]()
+
+        @callback
+        def _rollback(_now=None):
+            if self._optimistic.pop(lampId, None) is None:
+                return
+            _LOGGER.debug("No echo for lamp %s, rolling back", lampId)
+            if (update_callback := self._lamp_listeners.get(lampId)) is not None:
+                update_callback()
+            self.coordinator.async_request_resync()
+            self._hass.async_create_task(self.coordinator.async_request_refresh())
+
+        self._optimistic[lampId] = (
+            brightness,
+            async_call_later(self._hass, OPTIMISTIC_TIMEOUT, _rollback),
+            _rollback,
+        )
+
+    @callback
+    def _async_rollback(self, lampId):
+        """Roll back the optimistic state of a lamp right away."""
+        if (optimistic := self._optimistic.get(lampId)) is not None:
+            optimistic[1]()
+            optimistic[2]()
+
+    async def _async_write_brightness(self, lampId):
+        """Send the latest brightness of a lamp until no newer value is pending."""
+        try:
+            while (pending := self._brightness_pending.pop(lampId, None)) is not None:
+                value, futures = pending
+                try:
+                    await self._async_queue_command(
+                        lampId, f"set_brightness  {lampId} {value}"
+                    )
+                except Exception as err:  # pylint: disable=broad-except
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(err)
+                else:
+                    for future in futures:
+                        if not future.done():
+                            future.set_result(None)
+                if self._brightness_rate:
+                    await asyncio.sleep(1 / self._brightness_rate)
+        finally:
+            self._brightness_writers.discard(lampId)
+            self._brightness_targets.pop(lampId, None)
+
+    @callback
+    def _async_queue_command(self, lampId, msg):
+        """Add a lamp command to the batch which is flushed next.
+
+        All commands issued in the same event loop tick (or batch window) are
+        sent as one burst followed by a single coordinator refresh. Returns a
+        future which is done once the command has been acknowledged.
+        """
+        future = self._hass.loop.create_future()
+        self._batch.append((lampId, msg, future))
+        if self._batch_handle is None:
+            if self._batch_window:
+                self._batch_handle = self._hass.loop.call_later(
+                    self._batch_window / 1000, self._async_flush_batch
+                )
+            else:
+                self._batch_handle = self._hass.loop.call_soon(
+                    self._async_flush_batch
+                )
+        return future
+
+    @callback
+    def _async_flush_batch(self):
+        """Hand the collected commands over to a send task."""
+        batch, self._batch = self._batch, []
+        self._batch_handle = None
+        self._hass.async_create_task(self._async_send_batch(batch))
+
+    async def _async_send_batch(self, batch):
+        """Send a batch of lamp commands in one burst and refresh once."""
+        results = await asyncio.gather(
+            *(self._server.sendMsg(msg) for _, msg, _ in batch),
+            return_exceptions=True,
+        )
+        if not self._optimistic_mode and any(
+            not isinstance(result, BaseException) and lampId not in self._ramp_targets
+            for (lampId, _, _), result in zip(batch, results)
+        ):
+            # optimistic mode and transition steps rely on the echoes instead
+            # of a refresh
+            self.coordinator.async_request_resync()
+            await self.coordinator.async_refresh()
+
+        for (lampId, msg, future), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                self._async_rollback(lampId)
+            if future.done():
+                continue
+            if isinstance(result, asyncio.CancelledError):
+                # the request was dropped by closing the connection
+                future.set_exception(
+                    ConnectionError(f"{msg} not acknowledged, the connection closed")
+                )
+            elif isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                # refresh has already been done for the whole batch
+                future.set_result(None)
+
+    async def getAllLamps(self):
+        return await self._async_get_snapshot("getAllLamps", FRAME_LAMP_DATA)
+
+    async def getAllButtons(self):
+        return await self._async_get_snapshot("getAllButtons", FRAME_BUTTON_DATA)
+
+    async def _async_get_snapshot(self, msg, frameType):
+        """Request a snapshot for the coordinator and return the reply frame.
+
+        While the request is in flight, the frame handler leaves the reply to
+        the waiting coordinator refresh.
+        """
+        self._snapshot_requests[frameType] = (
+            self._snapshot_requests.get(frameType, 0) + 1
+        )
+        try:
+            return await self._server.sendMsg(msg, PRIORITY_REFRESH)
+        finally:
+            self._snapshot_requests[frameType] -= 1
 
     def shutdown(self):
         """Shutdown wiffi api.
 
-        Remove listener for periodic callbacks.
+        Remove the frame handlers and cancel pending timers and ramps. Lamp
+        commands which have not been sent yet fail with ConnectionError.
         """
-        if (remove_listener := self._periodic_callback) is not None:
-            remove_listener()
+        for remove_handler in self._remove_handlers:
+            remove_handler()
+        self._remove_handlers = []
+        if self._batch_handle is not None:
+            self._batch_handle.cancel()
+            self._batch_handle = None
+        batch, self._batch = self._batch, []
+        for _, msg, future in batch:
+            if not future.done():
+                future.set_exception(
+                    ConnectionError(f"{msg} not sent, the entry has been unloaded")
+                )
+        for _, cancel_timer, _ in self._optimistic.values():
+            cancel_timer()
+        self._optimistic.clear()
+        if self._transitions is not None:
+            self._transitions.async_cancel_all(self)
+        self._ramp_targets.clear()
 
     async def __call__(self, device, metrics):
-        """Process callback from TCP server if new data arrives from a device."""
-        if device.mac_address not in self._known_devices:
-            # add empty set for new device
-            self._known_devices[device.mac_address] = set()
+        """Process callback from TCP server if new data arrives from a device.
 
+        metrics only holds the metrics whose value changed. The update signal
+        of every metric is built once and cached; all new metrics of a
+        telegram are created with one signal, so each platform adds them in
+        one batch.
+        """
+        if (signals := self._known_devices.get(device.mac_address)) is None:
+            signals = self._known_devices[device.mac_address] = {}
+
+        new_metrics = []
         for metric in metrics:
-            if metric.id not in self._known_devices[device.mac_address]:
-                self._known_devices[device.mac_address].add(metric.id)
-                async_dispatcher_send(self._hass, CREATE_ENTITY_SIGNAL, device, metric)
-            else:
-                async_dispatcher_send(
-                    self._hass,
-                    f"{UPDATE_ENTITY_SIGNAL}-{generate_unique_id(device, metric)}",
-                    device,
-                    metric,
+            if (signal := signals.get(metric.id)) is None:
+                signals[metric.id] = (
+                    f"{UPDATE_ENTITY_SIGNAL}-{generate_unique_id(device, metric)}"
                 )
+                new_metrics.append(metric)
+            else:
+                async_dispatcher_send(self._hass, signal, device, metric)
+
+        if new_metrics:
+            async_dispatcher_send(self._hass, CREATE_ENTITY_SIGNAL, device, new_metrics)
 
     @property
     def server(self):
         """Return TCP server instance for start + close."""
         return self._server
 
-    @callback
-    def _periodic_tick(self, now=None):
-        """Check if any entity has timed out because it has not been updated."""
-        async_dispatcher_send(self._hass, CHECK_ENTITIES_SIGNAL)
-
 
 class WiffiEntity(Entity):
     """Common functionality for all wiffi entities."""
 
     _attr_should_poll = False
 
-    def __init__(self, device, metric, options):
+    def __init__(self, device, metric, config_entry):
         """Initialize the base elements of a wiffi entity."""
         self._id = generate_unique_id(device, metric)
+        self._device = device
         self._attr_unique_id = self._id
         self._attr_device_info = DeviceInfo(
             connections={(dr.CONNECTION_NETWORK_MAC, device.mac_address)},
@@ -293,8 +1034,8 @@ class WiffiEntity(Entity):
         )
         self._attr_name = metric.description
         self._expiration_date = None
-        self._value = None
-        self._timeout = options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
+        self._expirations = None
+        self._config_entry = config_entry
 
     async def async_added_to_hass(self):
         """Entity has been added to hass."""
@@ -305,38 +1046,43 @@ class WiffiEntity(Entity):
                 self._update_value_callback,
             )
         )
-        self.async_on_remove(
-            async_dispatcher_connect(
-                self.hass, CHECK_ENTITIES_SIGNAL, self._check_expiration_date
-            )
-        )
-        self.async_on_remove()
+        self._expirations = async_get_expirations(self.hass)
+        self._expirations.async_touch(self, self._expiration_date)
+        self.async_on_remove(partial(self._expirations.async_untrack, self))
+
+    @property
+    def _timeout(self):
+        """Return the expiration timeout in minutes, read live from the options."""
+        return self._config_entry.options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
 
     def reset_expiration_date(self):
         """Reset value expiration date.
 
         Will be called by derived classes after a value update has been received.
         """
-        self._expiration_date = utcnow() + timedelta(minutes=self._timeout)
+        self._expiration_date = time.monotonic() + self._timeout * 60
+        self._attr_available = True
+        if self._expirations is not None:
+            self._expirations.async_touch(self, self._expiration_date)
 
     @callback
     def _update_value_callback(self, device, metric):
         """Update the value of the entity."""
 
     @callback
-    def _check_expiration_date(self):
-        """Periodically check if entity value has been updated.
+    def async_expiration_deadline(self, deadline):
+        """Return the deadline extended by the last telegram of the device.
 
-        If there are no more updates from the wiffi device, the value will be
-        set to unavailable.
+        Telegrams with an unchanged value aren't dispatched, so every telegram
+        of the device counts as an update.
         """
-        if (
-            self._value is not None
-            and self._expiration_date is not None
-            and utcnow() > self._expiration_date
-        ):
-            self._value = None
-            self.async_write_ha_state()
+        return max(deadline, self._device.last_seen + self._timeout * 60)
+
+    @callback
+    def async_expire(self):
+        """Mark the entity unavailable, no update arrived before the deadline."""
+        self._attr_available = False
+        self.async_write_ha_state()
 
     def _is_measurement_entity(self):
         """Measurement entities have a value in present time."""
@@ -1,17 +1,33 @@
 """Demo platform that offers a fake button entity."""
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Iterable
+
+import voluptuous as vol
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, entity_platform
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import DOMAIN
+from . import DOMAIN, _async_lamps_by_entry
+from .binding import LightingLairdBinding
+from .const import (
+    ATTR_ACTION,
+    ATTR_LIGHTS,
+    ATTR_STEP,
+    BINDING_ACTIONS,
+    CONF_BINDINGS,
+    DEFAULT_BINDING_STEP,
+    SERVICE_BIND_BUTTON,
+    SERVICE_UNBIND_BUTTON,
+)
 from .entity import LightingLairdEntity
 from .models import LightingLairdData
+from .protocol import Button
 
 
 async def async_setup_entry(
@@ -19,19 +35,34 @@ async def async_setup_entry(
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
+    """Set up the buttons of a hub and add buttons which show up later on."""
     instance: LightingLairdData = hass.data[DOMAIN][config_entry.entry_id]
 
-    entities: list[BinarySensorEntity] = []
-    my_buttons = instance.coordinator.data["Buttons"]
-    if my_buttons is not None:
-        print(f"Got Buttons: {my_buttons}")
-        for button in my_buttons:
+    @callback
+    def _add_buttons(buttons: Iterable[Button]) -> None:
+        entities: list[BinarySensorEntity] = []
+        for button in buttons:
             entities.append(
-                LightingLairdButton(
-                    hass=hass, instance=instance, button=my_buttons.get(button)
-                )
+                LightingLairdButton(hass=hass, instance=instance, button=button)
             )
-    async_add_entities(entities)
+        async_add_entities(entities)
+
+    instance.api.async_set_button_add_listener(_add_buttons)
+    _add_buttons(instance.api.store.buttons())
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_BIND_BUTTON,
+        {
+            vol.Required(ATTR_LIGHTS): cv.entity_ids,
+            vol.Required(ATTR_ACTION): vol.In(BINDING_ACTIONS),
+            vol.Optional(ATTR_STEP, default=DEFAULT_BINDING_STEP): vol.All(
+                vol.Coerce(int), vol.Range(min=-100, max=100)
+            ),
+        },
+        "async_bind",
+    )
+    platform.async_register_entity_service(SERVICE_UNBIND_BUTTON, {}, "async_unbind")
 
 
 class LightingLairdButton(LightingLairdEntity, BinarySensorEntity):
@@ -42,45 +73,82 @@ class LightingLairdButton(LightingLairdEntity, BinarySensorEntity):
     _attr_should_poll = False
 
     def __init__(
-        self, hass: HomeAssistant, instance: LightingLairdData, button: dict[str, Any]
+        self, hass: HomeAssistant, instance: LightingLairdData, button: Button
     ) -> None:
         """Initialize an Advantage Air Light."""
         super().__init__(instance)
 
-        self._id: str = button["buttonId"]
-        self._attr_unique_id = f"LairdButton-{self._id}"
-        self._is_on = False
-        if "state" in button:
-            self._is_on = button["state"]
+        self._id: int = button.button_id
+        self._store = instance.api.store
+        self._initial_name = button.name
+        self._attr_unique_id = f"{self._hub_id}-LairdButton-{self._id}"
 
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, self._attr_unique_id)},
-            via_device=(DOMAIN, "LairdHub"),
-            name=button["name"],
+            via_device=(DOMAIN, self._hub_id),
+            name=button.name,
         )
         self.async_update_state = self.update_handle_factory(
             instance.api.async_update_state, self._id
         )
 
-        hass.bus.async_listen("laird-button", self._async_button_change)
+    async def async_added_to_hass(self) -> None:
+        """Register the button in the routing table once added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._api.async_register_button(self._id, self._async_button_change)
+        )
+
+    def _version(self) -> int:
+        """Return the version of the button in the state store."""
+        return self._store.button_version(self._id)
 
-    def _async_button_change(self, data):
-        if data.data["buttonId"] == int(self._id):
-            self._is_on = data.data["state"]
-            self.schedule_update_ha_state()
+    @callback
+    def _async_button_change(self) -> None:
+        """Handle a button state pushed by the hub for this button."""
+        self._async_write_version()
 
     @property
-    def _data(self) -> dict[str, Any]:
-        """Return the button object."""
-        if "Buttons" in self.coordinator.data:
-            if self._id in self.coordinator.data["Buttons"]:
-                return self.coordinator.data["Buttons"][self._id]
+    def available(self) -> bool:
+        """Return if the button is still reported by the hub."""
+        return super().available and self._store.has_button(self._id)
 
     @property
     def name(self) -> str:
-        return self._data["name"]
+        if self._store.has_button(self._id):
+            return self._store.button_name(self._id)
+        return self._initial_name
 
     @property
     def is_on(self) -> bool:
         """State of the binary sensor."""
-        return self._is_on
+        return bool(self._store.button_state(self._id))
+
+    async def async_bind(self, lights: list[str], action: str, step: int) -> None:
+        """Switch lamps of the hub directly whenever the button is pressed."""
+        lamps = _async_lamps_by_entry(self.hass, lights)
+        if lamps.keys() - {self._hub_id}:
+            raise ServiceValidationError(
+                "A button can only be bound to lamps of the same hub"
+            )
+        binding = LightingLairdBinding(
+            tuple(lamps.get(self._hub_id, {}).values()), action, step
+        )
+        self._async_save_binding(binding.as_dict())
+
+    async def async_unbind(self) -> None:
+        """Remove the binding of the button."""
+        self._async_save_binding(None)
+
+    @callback
+    def _async_save_binding(self, binding: dict | None) -> None:
+        """Save the binding in the options, which applies it to the running API."""
+        entry = self.hass.config_entries.async_get_entry(self._hub_id)
+        bindings = dict(entry.options.get(CONF_BINDINGS, {}))
+        if binding is None:
+            bindings.pop(str(self._id), None)
+        else:
+            bindings[str(self._id)] = binding
+        self.hass.config_entries.async_update_entry(
+            entry, options={**entry.options, CONF_BINDINGS: bindings}
+        )
@@ -0,0 +1,56 @@
+"""Bindings of wall buttons to lamps, executed by the integration itself."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+import logging
+from typing import Any
+
+from .const import (
+    BINDING_ACTION_DIM,
+    BINDING_ACTIONS,
+    CONF_BINDINGS,
+    DEFAULT_BINDING_STEP,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LightingLairdBinding:
+    """Lamps switched by a button press without a round trip through automations."""
+
+    __slots__ = ("action", "lamps", "step")
+
+    def __init__(
+        self, lamps: tuple[int, ...], action: str, step: int = DEFAULT_BINDING_STEP
+    ) -> None:
+        """Initialize the binding."""
+        self.lamps = lamps
+        self.action = action
+        self.step = step
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the binding as it is saved in the options."""
+        data: dict[str, Any] = {"lamps": list(self.lamps), "action": self.action}
+        if self.action == BINDING_ACTION_DIM:
+            data["step"] = self.step
+        return data
+
+
+def bindings_from_options(
+    options: Mapping[str, Any]
+) -> dict[int, LightingLairdBinding]:
+    """Return the bindings saved in the options by button id."""
+    bindings = {}
+    for key, item in options.get(CONF_BINDINGS, {}).items():
+        try:
+            action = item["action"]
+            if action not in BINDING_ACTIONS:
+                raise ValueError(f"unknown action {action}")
+            bindings[int(key)] = LightingLairdBinding(
+                tuple(int(lampId) for lampId in item["lamps"]),
+                action,
+                int(item.get("step", DEFAULT_BINDING_STEP)),
+            )
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.warning("Ignoring invalid binding of button %s: %s", key, err)
+    return bindings
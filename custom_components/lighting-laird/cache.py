@@ -0,0 +1,81 @@
+"""Persistent cache of the lamp and button inventory of a Lighting Laird hub."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .protocol import (
+    button_from_dict,
+    button_to_dict,
+    lamp_from_dict,
+    lamp_to_dict,
+)
+from .store import LightingLairdStateStore
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Seconds to collect snapshot changes before the cache is written
+SAVE_DELAY = 30
+
+
+class LightingLairdInventoryCache:
+    """Last known lamps and buttons of a hub, saved with the Store helper.
+
+    Lets the entities be created right away during startup, before the hub
+    has answered, and keeps them around as unavailable if it doesn't.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        state: LightingLairdStateStore | None = None,
+    ) -> None:
+        """Initialize the cache of a config entry.
+
+        state is the state store which is saved, it is only left out to
+        remove the cache.
+        """
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.inventory"
+        )
+        self._state = state
+
+    async def async_load(self) -> bool:
+        """Apply the cached inventory to the state store, False if there is none."""
+        state = self._state
+        if not (data := await self._store.async_load()):
+            return False
+        try:
+            lamps = [lamp_from_dict(item) for item in data["lamps"]]
+            buttons = [button_from_dict(item) for item in data["buttons"]]
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.warning("Ignoring invalid inventory cache: %s", err)
+            return False
+        state.apply_lamps(lamps)
+        state.apply_buttons(buttons)
+        return True
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save the current inventory and states after SAVE_DELAY."""
+        if self._state is not None:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the inventory of the state store to save."""
+        return {
+            "lamps": [lamp_to_dict(lamp) for lamp in self._state.lamps()],
+            "buttons": [button_to_dict(button) for button in self._state.buttons()],
+        }
+
+    async def async_remove(self) -> None:
+        """Remove the cache file."""
+        await self._store.async_remove()
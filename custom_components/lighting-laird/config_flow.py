@@ -5,7 +5,6 @@ Used by UI to setup a wiffi integration.
 from __future__ import annotations
 
 import errno
-import json
 import logging
 
 import voluptuous as vol
@@ -14,8 +13,29 @@ from homeassistant import config_entries
 from homeassistant.const import CONF_IP_ADDRESS, CONF_TIMEOUT
 from homeassistant.core import callback
 
-from .const import DEFAULT_IP_ADDRESS, DEFAULT_TIMEOUT, DOMAIN
-from .lairdserver import LightingLairdWebSocketServer
+from .const import (
+    CONF_BATCH_WINDOW,
+    CONF_BRIGHTNESS_RATE,
+    CONF_FIRE_EVENTS,
+    CONF_OPTIMISTIC,
+    CONF_POLL_SILENCE,
+    DEFAULT_BATCH_WINDOW,
+    DEFAULT_BRIGHTNESS_RATE,
+    DEFAULT_FIRE_EVENTS,
+    DEFAULT_IP_ADDRESS,
+    DEFAULT_OPTIMISTIC,
+    DEFAULT_POLL_SILENCE,
+    DEFAULT_TIMEOUT,
+    DOMAIN,
+)
+from .hub import CONFIG_FLOW_LINGER, async_get_hub_manager
+from .protocol import (
+    FRAME_BUTTON_DATA,
+    FRAME_LAMP_DATA,
+    ProtocolError,
+    decode_buttons,
+    decode_lamps,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,6 +44,7 @@ class WiffiFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     """Wiffi server setup config flow."""
 
     VERSION = 1
+    MINOR_VERSION = 2
 
     @staticmethod
     @callback
@@ -55,27 +76,40 @@ class WiffiFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             # await server.close_server()
 
             ip_address = user_input[CONF_IP_ADDRESS]
-            lairdConnection = LightingLairdWebSocketServer(ip_address)
-            await lairdConnection.start_server()
-
-            data = {}
-            lampData = await lairdConnection.get_lamps()
-            lampData = lampData[8:]
-            data["Lamps"] = json.loads(lampData)
-
-            buttonData = await lairdConnection.get_buttons()
-            buttonData = buttonData[10:]
-            data["Buttons"] = json.loads(buttonData)
+            manager = async_get_hub_manager(self.hass)
+            hub = manager.async_acquire(ip_address)
+            try:
+                await hub.async_connect()
+                hub.inventory = await self._async_get_inventory(hub.server)
+            except Exception:
+                await manager.async_release(hub)
+                raise
+            # keep the connection and inventory for the setup of the entry
+            await manager.async_release(hub, linger=CONFIG_FLOW_LINGER)
 
             return self.async_create_entry(
                 title=f"{user_input[CONF_IP_ADDRESS]}", data=user_input
             )
 
+        except ProtocolError:
+            return self.async_abort(reason="invalid_response")
         except OSError as exc:
             if exc.errno == errno.EADDRINUSE:
                 return self.async_abort(reason="addr_in_use")
             return self.async_abort(reason="start_server_failed")
 
+    async def _async_get_inventory(self, server):
+        """Download and decode the lamps and buttons of the hub."""
+        frameType, _, body = await server.sendMsg("getAllLamps")
+        if frameType != FRAME_LAMP_DATA:
+            raise ProtocolError(f"Unexpected reply to getAllLamps: {frameType}")
+        lamps = decode_lamps(body)
+
+        frameType, _, body = await server.sendMsg("getAllButtons")
+        if frameType != FRAME_BUTTON_DATA:
+            raise ProtocolError(f"Unexpected reply to getAllButtons: {frameType}")
+        return lamps, decode_buttons(body)
+
     @callback
     def _async_show_form(self, errors=None):
         """Show the config flow form to the user."""
@@ -96,7 +130,10 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
     async def async_step_init(self, user_input=None):
         """Manage the options."""
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            # button bindings are kept, they are set with the bind_button service
+            return self.async_create_entry(
+                title="", data={**self.config_entry.options, **user_input}
+            )
 
         return self.async_show_form(
             step_id="init",
@@ -108,6 +145,36 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                             CONF_TIMEOUT, DEFAULT_TIMEOUT
                         ),
                     ): int,
+                    vol.Optional(
+                        CONF_FIRE_EVENTS,
+                        default=self.config_entry.options.get(
+                            CONF_FIRE_EVENTS, DEFAULT_FIRE_EVENTS
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_BATCH_WINDOW,
+                        default=self.config_entry.options.get(
+                            CONF_BATCH_WINDOW, DEFAULT_BATCH_WINDOW
+                        ),
+                    ): vol.All(int, vol.Range(min=0, max=1000)),
+                    vol.Optional(
+                        CONF_BRIGHTNESS_RATE,
+                        default=self.config_entry.options.get(
+                            CONF_BRIGHTNESS_RATE, DEFAULT_BRIGHTNESS_RATE
+                        ),
+                    ): vol.All(int, vol.Range(min=0, max=50)),
+                    vol.Optional(
+                        CONF_OPTIMISTIC,
+                        default=self.config_entry.options.get(
+                            CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_POLL_SILENCE,
+                        default=self.config_entry.options.get(
+                            CONF_POLL_SILENCE, DEFAULT_POLL_SILENCE
+                        ),
+                    ): vol.All(int, vol.Range(min=60)),
                 }
             ),
         )
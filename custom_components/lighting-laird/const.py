@@ -12,4 +12,63 @@ DEFAULT_TIMEOUT = 3
 # Signal name to send create/update to platform (sensor/binary_sensor)
 CREATE_ENTITY_SIGNAL = "wiffi_create_entity_signal"
 UPDATE_ENTITY_SIGNAL = "wiffi_update_entity_signal"
-CHECK_ENTITIES_SIGNAL = "wiffi_check_entities_signal"
+
+# Option to additionally fire lamp/button changes on the HA event bus
+CONF_FIRE_EVENTS = "fire_events"
+DEFAULT_FIRE_EVENTS = False
+
+# Event bus names used when CONF_FIRE_EVENTS is enabled
+EVENT_BRIGHTNESS = "laird-brightness"
+EVENT_BUTTON = "laird-button"
+
+# Option for the window in milliseconds in which lamp commands are batched,
+# 0 batches all commands issued in the same event loop tick
+CONF_BATCH_WINDOW = "batch_window"
+DEFAULT_BATCH_WINDOW = 0
+
+# Option for the maximum number of brightness writes per second and lamp
+CONF_BRIGHTNESS_RATE = "brightness_rate"
+DEFAULT_BRIGHTNESS_RATE = 5
+
+# Option to show lamp commands optimistically until the hub echoes them
+CONF_OPTIMISTIC = "optimistic"
+DEFAULT_OPTIMISTIC = True
+
+# Seconds to wait for the echo of an optimistic lamp command before rollback
+OPTIMISTIC_TIMEOUT = 5
+
+# Hub brightness of a lamp which is turned on from off
+FULL_BRIGHTNESS = 254
+
+# Option for the seconds without any frame from the hub after which a full
+# snapshot is polled
+CONF_POLL_SILENCE = "poll_silence"
+DEFAULT_POLL_SILENCE = 300
+
+# Services applying and capturing lamp levels
+SERVICE_APPLY_SCENE = "apply_scene"
+SERVICE_CREATE_SCENE = "create_scene"
+SERVICE_DELETE_SCENE = "delete_scene"
+ATTR_LIGHTS = "lights"
+
+# Option holding the lamps switched directly by a button press, by button id
+CONF_BINDINGS = "bindings"
+BINDING_ACTION_TOGGLE = "toggle"
+BINDING_ACTION_ON = "on"
+BINDING_ACTION_OFF = "off"
+BINDING_ACTION_DIM = "dim"
+BINDING_ACTIONS = [
+    BINDING_ACTION_TOGGLE,
+    BINDING_ACTION_ON,
+    BINDING_ACTION_OFF,
+    BINDING_ACTION_DIM,
+]
+
+# Brightness change in percent of a dim binding per button press
+DEFAULT_BINDING_STEP = 10
+
+# Services binding buttons to lamps
+SERVICE_BIND_BUTTON = "bind_button"
+SERVICE_UNBIND_BUTTON = "unbind_button"
+ATTR_ACTION = "action"
+ATTR_STEP = "step"
@@ -0,0 +1,104 @@
+"""Data update coordinator for the Lighting Laird integration."""
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import DEFAULT_POLL_SILENCE
+from .protocol import (
+    FRAME_BUTTON_DATA,
+    FRAME_LAMP_DATA,
+    ProtocolError,
+    decode_buttons,
+    decode_lamps,
+)
+from .store import LightingLairdStateStore
+
+_LOGGER = logging.getLogger(__name__)
+
+# Interval in which the coordinator decides whether a snapshot is needed
+CHECK_INTERVAL = timedelta(seconds=60)
+
+
+class LightingLairdCoordinator(DataUpdateCoordinator):
+    """Coordinator which polls the hub only if the push stream went quiet.
+
+    The hub pushes bl, bs, lampData and buttonData frames over the websocket,
+    so a full getAllLamps/getAllButtons snapshot is only requested if no frame
+    has been received for poll_silence seconds, after a reconnect or when a
+    resync has been requested because drift was detected.
+    """
+
+    def __init__(self, hass: HomeAssistant, api) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="Lighting Laird",
+            update_interval=CHECK_INTERVAL,
+        )
+        self.api = api
+        self.poll_silence = DEFAULT_POLL_SILENCE
+        self._resync = True
+
+    @callback
+    def async_set_cached_data(self, data: LightingLairdStateStore) -> None:
+        """Set data restored from the inventory cache.
+
+        The data is not live, so the entities stay unavailable until the
+        first snapshot has been downloaded from the hub.
+        """
+        self.data = data
+        self.last_update_success = False
+        self._resync = True
+
+    @callback
+    def async_request_resync(self) -> None:
+        """Make the next refresh download a full snapshot."""
+        self._resync = True
+
+    def _snapshot_needed(self) -> bool:
+        """Return True if the push stream can't be trusted to be complete."""
+        if self._resync or self.data is None:
+            return True
+        since = self.api.server.metrics.seconds_since_last_frame
+        return since is None or since > self.poll_silence
+
+    async def _async_update_data(self) -> LightingLairdStateStore:
+        """Download a lamp and button snapshot if the stream went quiet.
+
+        The snapshot is applied to the state store of the API, which is the
+        data of the coordinator.
+        """
+        if not self._snapshot_needed():
+            return self.data
+
+        lamps = buttons = None
+        try:
+            lampData = await self.api.getAllLamps()
+            buttonData = await self.api.getAllButtons()
+        except OSError as err:
+            raise UpdateFailed(err) from err
+
+        try:
+            if lampData is not None and lampData[0] == FRAME_LAMP_DATA:
+                lamps = decode_lamps(lampData[2])
+            if buttonData is not None and buttonData[0] == FRAME_BUTTON_DATA:
+                buttons = decode_buttons(buttonData[2])
+        except ProtocolError as err:
+            raise UpdateFailed(err) from err
+
+        if lamps is not None and buttons is not None:
+            self._resync = False
+            self.api.async_apply_snapshot(lamps, buttons)
+            return self.api.store
+
+        _LOGGER.warning(
+            "Failed to update buttons and lamps on LightingLaird: Lamps:%s Buttons:%s",
+            lampData,
+            buttonData,
+        )
+        return self.data
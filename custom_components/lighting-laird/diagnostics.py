@@ -0,0 +1,46 @@
+"""Diagnostics support for the Lighting Laird integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_IP_ADDRESS
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .hub import async_get_hub_manager
+from .models import LightingLairdData
+
+TO_REDACT = {CONF_IP_ADDRESS}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    instance: LightingLairdData = hass.data[DOMAIN][entry.entry_id]
+    server = instance.api.server
+    store = instance.api.store
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "connection": {
+            "state": server.state,
+            "queue_depth": server.queue_depth,
+            "pending_requests": server.pending_requests,
+        },
+        "metrics": server.metrics.as_dict(),
+        "all_hubs": async_get_hub_manager(hass).aggregate_metrics(),
+        "inventory": {
+            "lamps": len(store.lamp_ids()),
+            "buttons": len(store.button_ids()),
+        },
+        "coordinator": {
+            "last_update_success": instance.coordinator.last_update_success,
+            "snapshot_changes": instance.api.snapshot_changes,
+        },
+    }
@@ -1,3 +1,4 @@
+from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -13,18 +14,53 @@ class LightingLairdEntity(CoordinatorEntity):
         """Initialize common aspects of an Advantage Air entity."""
         super().__init__(instance.coordinator)
         # self._attr_unique_id: str = self.coordinator.data["system"]["rid"]
+        self._api = instance.api
+        self._hub_id = instance.api.hub_id
+        self._seen_version = -1
+        self._last_available = True
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the store version and availability of the first state."""
+        await super().async_added_to_hass()
+        self._seen_version = self._version()
+        self._last_available = self.available
+
+    def _version(self) -> int:
+        """Return the version of the entity in the state store."""
+        return -1
+
+    @callback
+    def _async_write_version(self) -> None:
+        """Write the state and remember the store version and availability."""
+        self._seen_version = self._version()
+        self._last_available = self.available
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the entity changed in the state store."""
+        version = self._version()
+        available = self.available
+        if version != self._seen_version or available != self._last_available:
+            self._seen_version = version
+            self._last_available = available
+            super()._handle_coordinator_update()
 
     def update_handle_factory(self, func, *keys):
         """Return the provided API function wrapped.
 
-        Adds an error handler and coordinator refresh, and presets keys.
+        Adds an error handler and presets keys. The API function is called
+        right away, awaiting the returned handle waits until it is done.
         """
 
-        async def update_handle(*values):
-            try:
-                if await func(*keys, *values):
-                    await self.coordinator.async_refresh()
-            except OSError as err:
-                raise HomeAssistantError(err) from err
+        def update_handle(*values):
+            return self._async_update_handle(func(*keys, *values))
 
         return update_handle
+
+    async def _async_update_handle(self, pending):
+        """Await a pending API call, raising its errors as HomeAssistantError."""
+        try:
+            await pending
+        except OSError as err:
+            raise HomeAssistantError(err) from err
@@ -0,0 +1,111 @@
+"""Expiration of telegram entities, tracked by one shared deadline heap."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from . import WiffiEntity
+
+# Key of the expiration tracker in hass.data
+DATA_EXPIRATIONS = f"{DOMAIN}_expirations"
+
+
+class LightingLairdExpirations:
+    """Deadlines of all telegram entities, checked by a single timer.
+
+    Pushing a deadline forward only updates a dict. The heap keeps at most
+    one entry per entity with the deadline it was scheduled for; when that
+    entry comes due and the entity has been updated meanwhile, it is pushed
+    again with the current deadline. The timer only fires at the earliest
+    deadline, and all entities expired at that time are written at once.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the tracker."""
+        self.hass = hass
+        self._deadlines: dict[WiffiEntity, float] = {}
+        self._scheduled: dict[WiffiEntity, float] = {}
+        self._heap: list[tuple[float, int, WiffiEntity]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_deadline: float | None = None
+
+    @callback
+    def async_touch(self, entity: WiffiEntity, deadline: float) -> None:
+        """Set the monotonic time at which entity expires."""
+        self._deadlines[entity] = deadline
+        scheduled = self._scheduled.get(entity)
+        if scheduled is None or deadline < scheduled:
+            self._async_push(entity, deadline)
+
+    @callback
+    def async_untrack(self, entity: WiffiEntity) -> None:
+        """Stop tracking an entity, e.g. when it is removed."""
+        self._deadlines.pop(entity, None)
+        self._scheduled.pop(entity, None)
+        if not self._deadlines and self._timer is not None:
+            self._timer.cancel()
+            self._timer = self._timer_deadline = None
+            self._heap.clear()
+
+    @callback
+    def _async_push(self, entity: WiffiEntity, deadline: float) -> None:
+        """Schedule a heap entry and move the timer up if it is the earliest."""
+        self._scheduled[entity] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._sequence), entity))
+        if self._timer_deadline is None or deadline < self._timer_deadline:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer_deadline = deadline
+            self._timer = self.hass.loop.call_later(
+                max(0, deadline - time.monotonic()), self._async_expire
+            )
+
+    @callback
+    def _async_expire(self) -> None:
+        """Mark all entities whose deadline has passed unavailable."""
+        self._timer = self._timer_deadline = None
+        now = time.monotonic()
+        heap = self._heap
+        expired = []
+        while heap and heap[0][0] <= now:
+            scheduled, _, entity = heapq.heappop(heap)
+            if self._scheduled.get(entity) != scheduled:
+                continue
+            del self._scheduled[entity]
+            deadline = entity.async_expiration_deadline(self._deadlines[entity])
+            if deadline > now:
+                self._deadlines[entity] = deadline
+                self._async_push(entity, deadline)
+            else:
+                del self._deadlines[entity]
+                expired.append(entity)
+
+        for entity in expired:
+            entity.async_expire()
+
+        if heap and (
+            self._timer_deadline is None or heap[0][0] < self._timer_deadline
+        ):
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer_deadline = heap[0][0]
+            self._timer = self.hass.loop.call_later(
+                max(0, self._timer_deadline - now), self._async_expire
+            )
+
+
+@callback
+def async_get_expirations(hass: HomeAssistant) -> LightingLairdExpirations:
+    """Return the expiration tracker stored in hass.data."""
+    if (expirations := hass.data.get(DATA_EXPIRATIONS)) is None:
+        expirations = hass.data[DATA_EXPIRATIONS] = LightingLairdExpirations(hass)
+    return expirations
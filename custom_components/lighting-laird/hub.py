@@ -0,0 +1,137 @@
+"""Shared connections to Lighting Laird hubs."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .lairdserver import LightingLairdWebSocketServer
+from .metrics import aggregate_metrics
+from .protocol import Button, Lamp
+
+_LOGGER = logging.getLogger(__name__)
+
+# Key of the hub manager in hass.data
+DATA_HUBS = f"{DOMAIN}_hubs"
+
+# Seconds a connection opened by the config flow is kept for the setup
+CONFIG_FLOW_LINGER = 60
+
+
+class LightingLairdHubSession:
+    """Reference counted connection to one hub.
+
+    All config entries and config flows for the same host share the websocket,
+    its single reader task and the inventory downloaded by the config flow.
+    """
+
+    def __init__(self, hass: HomeAssistant, host: str) -> None:
+        """Initialize the session."""
+        self.hass = hass
+        self.host = host
+        self.server = LightingLairdWebSocketServer(host)
+        self.inventory: tuple[list[Lamp | None], dict[int, Button]] | None = None
+        self.refs = 0
+        self._reader: asyncio.Task | None = None
+        self._close_handle: asyncio.TimerHandle | None = None
+
+    @property
+    def connected(self) -> bool:
+        """Return True if the websocket is open."""
+        return self.server.connected
+
+    async def async_connect(self, timeout: float = 5) -> None:
+        """Open the websocket unless it is open already."""
+        if not self.connected:
+            await asyncio.wait_for(self.server.start_server(), timeout=timeout)
+
+    @callback
+    def async_start_reader(self) -> None:
+        """Start the reader task of the connection unless it is running."""
+        if self._reader is None:
+            self._reader = self.hass.async_create_background_task(
+                self.server.run_reader(), f"{DOMAIN} reader {self.host}"
+            )
+
+    async def async_close(self) -> None:
+        """Stop the reader and close the websocket.
+
+        The reader is awaited after cancelling it, so no task of the session
+        outlives it and a reload starts on a closed connection.
+        """
+        if (reader := self._reader) is not None:
+            self._reader = None
+            reader.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await reader
+        await self.server.close_server()
+
+
+class LightingLairdHubManager:
+    """Hands out one shared session per hub host."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the manager."""
+        self.hass = hass
+        self._sessions: dict[str, LightingLairdHubSession] = {}
+
+    @callback
+    def async_acquire(self, host: str) -> LightingLairdHubSession:
+        """Return the session of host and take a reference on it."""
+        if (session := self._sessions.get(host)) is None:
+            session = self._sessions[host] = LightingLairdHubSession(self.hass, host)
+        if session._close_handle is not None:
+            session._close_handle.cancel()
+            session._close_handle = None
+        session.refs += 1
+        return session
+
+    async def async_release(
+        self, session: LightingLairdHubSession, linger: float = 0
+    ) -> None:
+        """Drop a reference, close the session once it is no longer used.
+
+        With linger the connection is kept open that many seconds longer, so
+        the config entry created by a config flow can pick it up.
+        """
+        session.refs -= 1
+        if session.refs > 0:
+            return
+        if not linger:
+            await self._async_close(session)
+            return
+
+        @callback
+        def _close_unused():
+            session._close_handle = None
+            if session.refs <= 0:
+                self.hass.async_create_task(self._async_close(session))
+
+        session._close_handle = self.hass.loop.call_later(linger, _close_unused)
+
+    def aggregate_metrics(self) -> dict[str, Any]:
+        """Return the metrics of all hub connections added up."""
+        sessions = list(self._sessions.values())
+        return {
+            **aggregate_metrics(session.server.metrics for session in sessions),
+            "queue_depth": sum(session.server.queue_depth for session in sessions),
+        }
+
+    async def _async_close(self, session: LightingLairdHubSession) -> None:
+        """Close a session and forget it."""
+        if self._sessions.get(session.host) is session:
+            del self._sessions[session.host]
+        _LOGGER.debug("Closing connection to Lighting Laird Hub %s", session.host)
+        await session.async_close()
+
+
+@callback
+def async_get_hub_manager(hass: HomeAssistant) -> LightingLairdHubManager:
+    """Return the hub manager stored in hass.data."""
+    if (manager := hass.data.get(DATA_HUBS)) is None:
+        manager = hass.data[DATA_HUBS] = LightingLairdHubManager(hass)
+    return manager
@@ -1,23 +1,93 @@
 """Parser for wiffi telegrams and server for wiffi devices."""
 import asyncio
+import contextlib
+import heapq
+import itertools
 import json
+import logging
+import random
+import time
 
 import websockets
 from websockets.protocol import State
 
+from .metrics import DECODE_SAMPLE_EVERY, LightingLairdMetrics
+from .protocol import decode_frame, reply_key
+
+_LOGGER = logging.getLogger(__name__)
+
+# States of the connection to the hub
+STATE_CONNECTING = "connecting"
+STATE_OPEN = "open"
+STATE_DEGRADED = "degraded"
+STATE_CLOSED = "closed"
+CONNECTION_STATES = [STATE_CONNECTING, STATE_OPEN, STATE_DEGRADED, STATE_CLOSED]
+
+# Seconds to wait for the hub to accept a connection
+CONNECT_TIMEOUT = 5
+
+# Reconnect backoff in seconds, doubled after every failed attempt
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 300
+
+
+# Priorities of outbound frames, lower values are sent first
+PRIORITY_COMMAND = 0
+PRIORITY_REFRESH = 1
+
+# Maximum number of outbound frames waiting to be written
+QUEUE_SIZE = 256
+
+# Seconds a queued frame is held, e.g. during a reconnect, before it is dropped
+HOLD_TIMEOUT = 30
+
+# Wiffi telegrams are terminated by this byte
+TELEGRAM_SEPARATOR = b"\x04"
+
+# Bytes read from a wiffi connection at once and maximum size of a telegram
+READ_CHUNK_SIZE = 4096
+MAX_TELEGRAM_SIZE = 65536
+
+# Metrics taken from the Systeminfo of a telegram: id, unit, type, key
+SYSTEM_INFO_METRICS = (
+    ("rssi", "dBm", "number", "WLAN_Signal_dBm"),
+    ("uptime", "s", "number", "sec_seit_reset"),
+    ("ssid", None, "string", "WLAN_ssid"),
+)
+
+
+class CommandQueueFull(ConnectionError):
+    """Raised if the outbound queue of the hub connection is full."""
+
+
+def reconnect_delay(attempt):
+    """Return the seconds to wait before reconnect attempt number attempt.
+
+    The delay grows exponentially up to RECONNECT_MAX_DELAY. Half of it is
+    random so Home Assistant instances which lost the same hub don't retry
+    in lock-step.
+    """
+    delay = min(RECONNECT_MAX_DELAY, RECONNECT_MIN_DELAY * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
 
 class LightingLairdHub:
     """Representation of wiffi device properties reported in the json telegram."""
 
     def __init__(self, moduletype, data, configuration_url):
         """Initialize the instance."""
-        self._moduletype = moduletype
         self._mac_address = data.get("MAC-Adresse")
+        self.update(moduletype, data, configuration_url)
+
+    def update(self, moduletype, data, configuration_url):
+        """Update the properties from a new telegram of the device."""
+        self._moduletype = moduletype
         self._dest_ip = data.get("Homematic_CCU_ip")
         self._wlan_ssid = data.get("WLAN_ssid")
         self._wlan_signal_strength = float(data.get("WLAN_Signal_dBm", 0))
         self._sw_version = data.get("firmware")
         self._configuration_url = configuration_url
+        self.last_seen = time.monotonic()
 
     @property
     def moduletype(self):
@@ -55,6 +125,86 @@ class LightingLairdHub:
         return self._configuration_url
 
 
+class LightingLairdMetric:
+    """Representation of a metric reported in the json telegram.
+
+    Metric objects are cached per device and updated in place, so entities
+    holding one always see the latest value.
+    """
+
+    __slots__ = (
+        "description",
+        "id",
+        "metric_type",
+        "name",
+        "unit_of_measurement",
+        "value",
+    )
+
+    def __init__(self, metric_id, name, description, metric_type, unit, value):
+        """Initialize the instance."""
+        self.id = metric_id
+        self.name = name
+        self.description = description
+        self.metric_type = metric_type
+        self.unit_of_measurement = unit
+        self.value = self.convert(value)
+
+    @classmethod
+    def from_var(cls, var):
+        """Create a metric from an entry of the 'vars' list of a telegram."""
+        return cls(
+            var["name"],
+            var.get("homematic_name", var["name"]),
+            var.get("desc", var["name"]),
+            var.get("type"),
+            var.get("unit"),
+            var.get("value"),
+        )
+
+    @classmethod
+    def from_system_info(cls, metric_id, unit, metric_type, value):
+        """Create a metric from a value of the 'Systeminfo' of a telegram."""
+        return cls(metric_id, metric_id, metric_id, metric_type, unit, value)
+
+    @property
+    def is_number(self):
+        """Return True if the metric has a number value."""
+        return self.metric_type == "number"
+
+    @property
+    def is_bool(self):
+        """Return True if the metric has a boolean value."""
+        return self.metric_type == "boolean"
+
+    @property
+    def is_string(self):
+        """Return True if the metric has a string value."""
+        return self.metric_type == "string"
+
+    def convert(self, value):
+        """Return value converted to the type of the metric."""
+        if value is None:
+            return None
+        if self.metric_type == "number":
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+        if self.metric_type == "boolean":
+            return value is True or str(value).lower() in ("true", "1", "on")
+        return value
+
+    def update(self, unit, value):
+        """Update unit and value, return True if either changed."""
+        value = self.convert(value)
+        if value == self.value and unit == self.unit_of_measurement:
+            return False
+        self.value = value
+        self.unit_of_measurement = unit
+        return True
+
+
 class LightingLairdDevices:
     def __init__(self, server):
         """Initialize the instance."""
@@ -65,79 +215,102 @@ class LightingLairdDevices:
 
 
 class LightingLairdConnection:
-    """Representation of a TCP connection between a wiffi device and the server.
+    """Streaming listener for wiffi devices sending json telegrams over TCP.
 
     The following behaviour has been observed with weatherman firmware 107:
     For every json telegram which has to be sent by the wiffi device to the TCP
     server, a new TCP connection will be opened. After 1 json telegram has been
     transmitted, the connection will be closed again. The telegram is terminated
-    by a 0x04 character. Therefore we read until we receive a 0x04 character and
-    parse the whole telegram afterwards. Then we wait for the next telegram, but
-    the connection will be closed by the wiffi device. Therefore we get an
-    'IncompleteReadError exception which we will ignore. We don't close the
-    connection on our own, because the behaviour that the wiffi device closes
-    the connection after every telegram may change in the future.
+    by a 0x04 character.
+
+    One instance serves all connections. Data is read in chunks into a buffer
+    bounded by MAX_TELEGRAM_SIZE and split at the 0x04 separators, so any
+    number of telegrams per connection is handled and the connection is closed
+    at EOF. Device and metric objects are cached per MAC address and updated
+    in place; the callback only receives the metrics whose value changed.
     """
 
     def __init__(self, server):
         """Initialize the instance."""
         self._server = server
+        self._devices = {}
+        self._metrics = {}
 
     async def __call__(self, reader, writer):
         """Process callback from the TCP server if a new connection has been opened."""
         peername = writer.get_extra_info("peername")
-        while not reader.at_eof():
-            try:
-                data = await reader.readuntil(
-                    b"\x04"
-                )  # read until separator \x04 received
-                await self.parse_msg(peername, data[:-1])  # omit separator with [:-1]
-            except asyncio.IncompleteReadError:
-                pass
+        buffer = bytearray()
+        try:
+            while chunk := await reader.read(READ_CHUNK_SIZE):
+                buffer += chunk
+                start = 0
+                while (end := buffer.find(TELEGRAM_SEPARATOR, start)) != -1:
+                    await self.parse_msg(peername, bytes(buffer[start:end]))
+                    start = end + 1
+                del buffer[:start]
+                if len(buffer) > MAX_TELEGRAM_SIZE:
+                    _LOGGER.warning(
+                        "Telegram from %s exceeds %d bytes, closing connection",
+                        peername,
+                        MAX_TELEGRAM_SIZE,
+                    )
+                    break
+        except ConnectionError as err:
+            _LOGGER.debug("Connection from %s lost: %s", peername, err)
+        finally:
+            writer.close()
 
     async def parse_msg(self, peername, raw_data):
         """Parse received telegram which is terminated by 0x04."""
-        data = json.loads(raw_data.decode("utf-8"))
-
-        moduletype = data["modultyp"]
-        systeminfo = data["Systeminfo"]
-        configuration_url = f"http://{peername[0]}"
-
-        metrics = []
-        for var in data["vars"]:
-            metrics.append(WiffiMetric(var))
-
         try:
-            metrics.append(
-                WiffiMetricFromSystemInfo(
-                    "rssi", "dBm", "number", data["Systeminfo"]["WLAN_Signal_dBm"]
-                )
-            )
-        except KeyError:
-            pass
-
+            data = json.loads(raw_data)
+            moduletype = data["modultyp"]
+            systeminfo = data["Systeminfo"]
+            variables = data["vars"]
+            mac_address = systeminfo["MAC-Adresse"]
+        except (ValueError, TypeError, KeyError) as err:
+            _LOGGER.warning("Ignoring invalid telegram from %s: %s", peername, err)
+            return
+
+        configuration_url = f"http://{peername[0]}" if peername else None
         try:
-            metrics.append(
-                WiffiMetricFromSystemInfo(
-                    "uptime", "s", "number", data["Systeminfo"]["sec_seit_reset"]
+            if (device := self._devices.get(mac_address)) is None:
+                device = self._devices[mac_address] = LightingLairdHub(
+                    moduletype, systeminfo, configuration_url
                 )
-            )
-        except KeyError:
-            pass
-
-        try:
-            metrics.append(
-                WiffiMetricFromSystemInfo(
-                    "ssid", None, "string", data["Systeminfo"]["WLAN_ssid"]
+                self._metrics[mac_address] = {}
+            else:
+                device.update(moduletype, systeminfo, configuration_url)
+        except (TypeError, ValueError) as err:
+            _LOGGER.warning("Ignoring invalid telegram from %s: %s", peername, err)
+            return
+        metrics = self._metrics[mac_address]
+
+        changed = []
+        for var in variables:
+            try:
+                metric_id = var["name"]
+                if (metric := metrics.get(metric_id)) is None:
+                    metric = metrics[metric_id] = LightingLairdMetric.from_var(var)
+                elif not metric.update(var.get("unit"), var.get("value")):
+                    continue
+            except (TypeError, KeyError):
+                continue
+            changed.append(metric)
+
+        for metric_id, unit, metric_type, key in SYSTEM_INFO_METRICS:
+            if (value := systeminfo.get(key)) is None:
+                continue
+            if (metric := metrics.get(metric_id)) is None:
+                metric = metrics[metric_id] = LightingLairdMetric.from_system_info(
+                    metric_id, unit, metric_type, value
                 )
-            )
-        except KeyError:
-            pass
+            elif not metric.update(unit, value):
+                continue
+            changed.append(metric)
 
-        if self._server.callback is not None:
-            await self._server.callback(
-                WiffiDevice(moduletype, systeminfo, configuration_url), metrics
-            )
+        if changed and self._server.callback is not None:
+            await self._server.callback(device, changed)
 
 
 class LightingLairdWebSocketServer:
@@ -146,12 +319,298 @@ class LightingLairdWebSocketServer:
     Opens a single port and listens for incoming TCP connections.
     """
 
-    def __init__(self, host, callback=None):
+    def __init__(self, host, callback=None, request_timeout=5):
         """Initialize instance."""
         self.host = host
         self.callback = callback
         self.server = None
+        self.state = STATE_CLOSED
         self.disableRecv = False
+        self.request_timeout = request_timeout
+        self.metrics = LightingLairdMetrics()
+        self._pending = {}
+        self._connecting = None
+        self._recv_lock = asyncio.Lock()
+        self._queue = []
+        self._queued_refreshes = {}
+        self._sequence = itertools.count()
+        self._queue_changed = asyncio.Event()
+        self._queue_space = asyncio.Event()
+        self._open = asyncio.Event()
+        self._writer = None
+        self._frame_handlers = []
+        self._state_handlers = []
+
+    def add_frame_handler(self, handler):
+        """Call handler(frame, resolved) for every frame read from the hub.
+
+        resolved is True if the frame answered a pending request. Returns a
+        function which removes the handler again.
+        """
+        return self._add_handler(self._frame_handlers, handler)
+
+    def add_state_handler(self, handler):
+        """Call handler(state) whenever the connection state changes.
+
+        Returns a function which removes the handler again.
+        """
+        return self._add_handler(self._state_handlers, handler)
+
+    @staticmethod
+    def _add_handler(handlers, handler):
+        """Add handler to handlers, return a function which removes it."""
+        handlers.append(handler)
+
+        def remove_handler():
+            if handler in handlers:
+                handlers.remove(handler)
+
+        return remove_handler
+
+    def _set_state(self, state):
+        """Change the connection state and tell the state handlers."""
+        if state == self.state:
+            return
+        _LOGGER.debug("Connection to %s: %s -> %s", self.host, self.state, state)
+        self.state = state
+        if state == STATE_OPEN:
+            self._open.set()
+        else:
+            self._open.clear()
+        for handler in self._state_handlers:
+            handler(state)
+
+    @property
+    def queue_depth(self):
+        """Return the number of outbound frames waiting to be written."""
+        return len(self._queue)
+
+    @property
+    def pending_requests(self):
+        """Return the number of requests waiting for their reply."""
+        return sum(map(len, self._pending.values()))
+
+    @property
+    def connected(self):
+        """Return True if the websocket is open."""
+        return self.server is not None and self.server.state is State.OPEN
+
+    async def run_reader(self):
+        """Read frames from the hub and hand them to the frame handlers.
+
+        This is the single reader of the connection, it runs until it is
+        cancelled. Whenever the connection is lost it reconnects with
+        exponential backoff and jitter, and requests one lamp and button
+        snapshot after every successful reconnect to catch up on missed
+        pushes.
+        """
+        await self.disable_recv()
+        if not self.connected:
+            self._set_state(STATE_DEGRADED)
+        self._writer = asyncio.ensure_future(self._run_writer())
+        try:
+            await self._read_and_reconnect()
+        finally:
+            self._writer.cancel()
+            self._writer = None
+
+    async def _read_and_reconnect(self):
+        """Read from the connection, reconnect whenever it has been lost."""
+        attempt = 0
+        while True:
+            if self.connected:
+                metrics = self.metrics
+                try:
+                    async for message in self.server:
+                        _LOGGER.debug("client got %s", message)
+                        try:
+                            if metrics.frames_total % DECODE_SAMPLE_EVERY:
+                                frame = decode_frame(message)
+                            else:
+                                start = time.perf_counter_ns()
+                                frame = decode_frame(message)
+                                metrics.record_decode(time.perf_counter_ns() - start)
+                        except ValueError:
+                            _LOGGER.warning("Ignoring malformed frame: %s", message)
+                            continue
+                        metrics.record_frame(frame[0])
+                        resolved = self.resolve(frame)
+                        for handler in self._frame_handlers:
+                            try:
+                                handler(frame, resolved)
+                            except Exception:  # pylint: disable=broad-except
+                                # a failing handler must not drop the connection
+                                _LOGGER.exception("Error handling frame %s", message)
+                    _LOGGER.warning(
+                        "Lighting Laird Hub %s closed the connection", self.host
+                    )
+                except Exception as err:
+                    _LOGGER.warning("Lighting Laird WebSocket connection lost: %s", err)
+                server, self.server = self.server, None
+                self._set_state(STATE_DEGRADED)
+                # release the client slot of the hub before reconnecting
+                with contextlib.suppress(Exception):
+                    await server.close()
+
+            delay = reconnect_delay(attempt)
+            attempt += 1
+            _LOGGER.info(
+                "Reconnecting to Lighting Laird Hub %s in %.1f seconds",
+                self.host,
+                delay,
+            )
+            await asyncio.sleep(delay)
+            try:
+                await asyncio.wait_for(self.start_server(), CONNECT_TIMEOUT)
+            except Exception as err:
+                _LOGGER.warning("Reconnection to %s failed: %s", self.host, err)
+                continue
+
+            _LOGGER.info("Reconnected to Lighting Laird Hub %s", self.host)
+            attempt = 0
+            self.metrics.reconnects += 1
+            await self.resync()
+
+    async def resync(self):
+        """Queue a lamp and a button snapshot request.
+
+        The replies are not awaited, the reader passes them on to the frame
+        handlers like pushed snapshots. The state of the lamps and buttons is
+        only rebuilt once however many config entries share the connection.
+        """
+        try:
+            self.enqueue_nowait("getAllLamps", PRIORITY_REFRESH)
+            self.enqueue_nowait("getAllButtons", PRIORITY_REFRESH)
+        except CommandQueueFull as err:
+            _LOGGER.warning("Resync with %s failed: %s", self.host, err)
+
+    def enqueue_nowait(self, msg, priority=PRIORITY_COMMAND):
+        """Queue msg for the writer, return a future set once it is written.
+
+        A refresh which is already queued is merged with the new one and its
+        future is returned. Raises CommandQueueFull if the queue is full.
+        """
+        if priority != PRIORITY_COMMAND:
+            if (written := self._queued_refreshes.get(msg)) is not None:
+                return written
+        if len(self._queue) >= QUEUE_SIZE:
+            raise CommandQueueFull(
+                f"Outbound queue of Lighting Laird Hub {self.host} is full"
+            )
+        written = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), msg, written))
+        if priority != PRIORITY_COMMAND:
+            self._queued_refreshes[msg] = written
+        self._queue_changed.set()
+        return written
+
+    async def enqueue(self, msg, priority=PRIORITY_COMMAND):
+        """Queue msg for the writer, waiting for space if the queue is full."""
+        while True:
+            try:
+                return self.enqueue_nowait(msg, priority)
+            except CommandQueueFull:
+                self._queue_space.clear()
+                await self._queue_space.wait()
+                if self.state == STATE_CLOSED:
+                    raise ConnectionError(
+                        f"Lighting Laird Hub {self.host} is closed"
+                    ) from None
+
+    async def send(self, msg, priority=PRIORITY_COMMAND):
+        """Queue msg and wait until the writer has written it.
+
+        Commands go ahead of refreshes and keep their order. While the hub is
+        reconnecting they are held for up to HOLD_TIMEOUT seconds, a command
+        which times out is dropped so it isn't executed late.
+        """
+        written = None
+        try:
+            async with asyncio.timeout(HOLD_TIMEOUT):
+                written = await self.enqueue(msg, priority)
+                await asyncio.shield(written)
+        except (TimeoutError, asyncio.CancelledError):
+            if written is not None and priority == PRIORITY_COMMAND:
+                written.cancel()
+            raise
+
+    async def _run_writer(self):
+        """Write queued frames by priority while the connection is open."""
+        queue = self._queue
+        while True:
+            if not queue:
+                self._queue_changed.clear()
+                await self._queue_changed.wait()
+                continue
+            if not self.connected:
+                # the reader sets it again once it has reconnected
+                self._open.clear()
+                await self._open.wait()
+                continue
+
+            entry = heapq.heappop(queue)
+            priority, _, msg, written = entry
+            if self._queued_refreshes.get(msg) is written:
+                del self._queued_refreshes[msg]
+            self._queue_space.set()
+            if written.done():
+                # the sender has given up
+                continue
+            try:
+                await self.server.send(msg)
+            except Exception as err:
+                if self.connected:
+                    written.set_exception(err)
+                    continue
+                _LOGGER.debug(
+                    "Holding %s until %s is reconnected: %s", msg, self.host, err
+                )
+                heapq.heappush(queue, entry)
+                if priority != PRIORITY_COMMAND:
+                    self._queued_refreshes[msg] = written
+                continue
+            written.set_result(None)
+
+    def resolve(self, frame):
+        """Resolve all requests waiting for the decoded frame.
+
+        Called by the single reader of the connection. Returns True if at
+        least one request was waiting for the frame.
+        """
+        if not (futures := self._pending.pop((frame[0], frame[1]), None)):
+            return False
+        for future in futures:
+            if not future.done():
+                future.set_result(frame)
+        return True
+
+    async def request(self, msg, timeout=None, priority=PRIORITY_COMMAND):
+        """Send msg and wait until the reader receives the matching reply.
+
+        Any number of requests may be in flight on the connection at the
+        same time. Returns the decoded reply frame, raises
+        asyncio.TimeoutError if no reply arrives in time.
+        """
+        key = reply_key(msg)
+        if key is None:
+            await self.send(msg, priority)
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(key, []).append(future)
+        try:
+            await self.send(msg, priority)
+            sent = time.perf_counter()
+            frame = await asyncio.wait_for(
+                future, timeout if timeout is not None else self.request_timeout
+            )
+            self.metrics.record_rtt(key[0], time.perf_counter() - sent)
+            return frame
+        finally:
+            if (futures := self._pending.get(key)) is not None and future in futures:
+                futures.remove(future)
+                if not futures:
+                    del self._pending[key]
 
     async def consumer_handler(self, websocket):
         async for message in websocket:
@@ -162,51 +621,97 @@ class LightingLairdWebSocketServer:
         await asyncio.gather(self.consumer_handler(websocket))
 
     async def start_server(self):
+        """Connect to the hub unless the websocket is open.
+
+        Single-flight: while a connect is in progress every caller joins it
+        instead of opening another socket. Cancelling a caller (e.g. by a
+        timeout) doesn't abort the connect for the others.
+        """
+        if self.connected:
+            return
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._open_connection())
+            self._connecting.add_done_callback(self._connect_done)
+        await asyncio.shield(self._connecting)
+
+    def _connect_done(self, task):
+        """Forget the finished connect attempt."""
+        self._connecting = None
+        if not task.cancelled():
+            task.exception()
+
+    async def _open_connection(self):
         """Connect to the WebSocket server with keepalive ping/pong."""
-        ws = await websockets.connect(
-            f"ws://{self.host}/ws",
-            ping_interval=20,
-            ping_timeout=20,
-        )
-        await ws.send("ping")
-        message = await ws.recv()
+        self._set_state(STATE_CONNECTING)
+        try:
+            ws = await websockets.connect(
+                f"ws://{self.host}/ws",
+                ping_interval=20,
+                ping_timeout=20,
+            )
+            await ws.send("ping")
+            message = await ws.recv()
+        except asyncio.CancelledError:
+            self._set_state(STATE_CLOSED)
+            raise
+        except Exception:
+            # the reader retries with backoff, otherwise nobody does
+            self._set_state(STATE_DEGRADED if self.disableRecv else STATE_CLOSED)
+            raise
         self.server = ws
+        self._set_state(STATE_OPEN)
+
+    async def _async_ensure_connected(self):
+        """Make sure the websocket is open before a command is sent.
+
+        Once the reader runs it owns reconnecting, commands are then held in
+        the outbound queue instead of opening sockets outside its backoff.
+        """
+        if self.connected:
+            return
+        if self.disableRecv:
+            if self.state == STATE_CLOSED:
+                raise ConnectionError(f"Lighting Laird Hub {self.host} is closed")
+            return
+        await self.start_server()
 
     async def disable_recv(self):
-        self.disableRecv = True
-
-    async def get_lamps(self):
-        if self.server is None or self.server.state is not State.OPEN:
-            await self.start_server()
-
-        if self.server is not None:
-            await self.server.send("getAllLamps")
-            if self.disableRecv is False:
-                message = await self.server.recv()
-                return message
-
-    async def get_buttons(self):
-        if self.server is None or self.server.state is not State.OPEN:
-            await self.start_server()
-
-        if self.server is not None:
-            await self.server.send("getAllButtons")
-            if self.disableRecv is False:
-                message = await self.server.recv()
-                return message
+        """Hand receiving over to the reader once no lock-step call is running."""
+        async with self._recv_lock:
+            self.disableRecv = True
 
     async def close_server(self):
-        """Close TCP server."""
-        if self.server is not None:
-            await self.server.close()
-            await self.server.wait_closed()
-
-    async def sendMsg(self, msg):
-        if self.server is None or self.server.state is not State.OPEN:
-            await self.start_server()
-
-        if self.server is not None:
-            await self.server.send(msg)
-            if self.disableRecv is False:
-                message = await self.server.recv()
-                return message
+        """Close TCP server.
+
+        Pending requests and queued frames are cancelled, senders waiting for
+        space in the queue fail with ConnectionError.
+        """
+        if self._connecting is not None:
+            self._connecting.cancel()
+        for futures in self._pending.values():
+            for future in futures:
+                future.cancel()
+        self._pending.clear()
+        for *_, written in self._queue:
+            written.cancel()
+        self._queue.clear()
+        self._queued_refreshes.clear()
+        if (server := self.server) is not None:
+            # the reader may drop self.server while the close is awaited
+            await server.close()
+            await server.wait_closed()
+            if self.server is server:
+                self.server = None
+        self._set_state(STATE_CLOSED)
+        self._queue_space.set()
+
+    async def sendMsg(self, msg, priority=PRIORITY_COMMAND):
+        await self._async_ensure_connected()
+
+        if not self.disableRecv:
+            async with self._recv_lock:
+                if not self.disableRecv:
+                    await self.server.send(msg)
+                    message = await self.server.recv()
+                    return decode_frame(message)
+        return await self.request(msg, priority=priority)
@@ -1,17 +1,26 @@
 """Demo light platform that implements lights."""
 from __future__ import annotations
 
+from collections.abc import Iterable
 from typing import Any
 
-from homeassistant.components.light import ATTR_BRIGHTNESS, ColorMode, LightEntity
+from homeassistant.components.light import (
+    ATTR_BRIGHTNESS,
+    ATTR_TRANSITION,
+    ColorMode,
+    LightEntity,
+    LightEntityFeature,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import DOMAIN
+from .const import FULL_BRIGHTNESS
 from .entity import LightingLairdEntity
 from .models import LightingLairdData
+from .protocol import Lamp
 
 LIGHT_COLORS = [(56, 86), (345, 75)]
 
@@ -31,52 +40,77 @@ class LightingLairdLight(LightingLairdEntity, LightEntity):
     _attr_name = None
 
     def __init__(
-        self, hass: HomeAssistant, instance: LightingLairdData, light: dict[str, Any]
+        self, hass: HomeAssistant, instance: LightingLairdData, light: Lamp
     ) -> None:
         """Initialize a Lighting Laird light."""
         super().__init__(instance)
 
-        self._id: str = light["lampId"]
-        self._attr_unique_id = f"LairdLamp-{self._id}"
+        self._id: int = light.lamp_id
+        self._store = instance.api.store
+        self._initial_name = light.name
+        self._attr_unique_id = f"{self._hub_id}-LairdLamp-{self._id}"
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, self._attr_unique_id)},
-            via_device=(DOMAIN, "LairdHub"),
-            name=light["name"],
+            via_device=(DOMAIN, self._hub_id),
+            name=light.name,
         )
         self.async_update_state = self.update_handle_factory(
             instance.api.async_update_state, self._id
         )
 
-        hass.bus.async_listen("laird-brightness", self._async_update_brightness)
+    async def async_added_to_hass(self) -> None:
+        """Register the lamp in the routing table once added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._api.async_register_lamp(self._id, self._async_update_brightness)
+        )
+
+    def _version(self) -> int:
+        """Return the version of the lamp in the state store."""
+        return self._store.lamp_version(self._id)
+
+    @callback
+    def _async_update_brightness(self) -> None:
+        """Handle a brightness level pushed by the hub for this lamp.
 
-    def _async_update_brightness(self, data):
-        if data.data["lampId"] == self._id:
-            print(f"Event received: {data}")
-            self._data["brightness"] = data.data["brightness"]
-            self.schedule_update_ha_state()
+        Also called if an optimistic state has been rolled back.
+        """
+        self._async_write_version()
 
     @property
-    def _data(self) -> dict[str, Any]:
-        """Return the light object."""
-        if "Lamps" in self.coordinator.data:
-            return self.coordinator.data["Lamps"][self._id]
+    def available(self) -> bool:
+        """Return if the lamp is still reported by the hub."""
+        return super().available and self._store.has_lamp(self._id)
 
     @property
     def name(self) -> str:
-        return self._data["name"]
+        if self._store.has_lamp(self._id):
+            return self._store.lamp_name(self._id)
+        return self._initial_name
+
+    @property
+    def _brightness(self) -> int:
+        """Return the brightness being written, else the last known one."""
+        if (target := self._api.brightness_target(self._id)) is not None:
+            return target
+        return self._store.lamp_brightness(self._id)
 
     @property
     def is_on(self) -> bool:
         """Return if the light is on."""
-        return self._data["brightness"] > 0
+        return self._brightness > 0
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
-        await self.async_update_state(True)
+        update = self.async_update_state(True)
+        self.async_write_ha_state()
+        await update
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
-        await self.async_update_state(False)
+        update = self.async_update_state(False)
+        self.async_write_ha_state()
+        await update
 
 
 class LightingLairdLightDimmable(LightingLairdLight):
@@ -84,8 +118,10 @@ class LightingLairdLightDimmable(LightingLairdLight):
 
     _attr_supported_color_modes = {ColorMode.BRIGHTNESS}
     _attr_color_mode = ColorMode.BRIGHTNESS
+    _attr_supported_features = LightEntityFeature.TRANSITION
+
     def __init__(
-        self, hass: HomeAssistant, instance: LightingLairdData, light: dict[str, Any]
+        self, hass: HomeAssistant, instance: LightingLairdData, light: Lamp
     ) -> None:
         """Initialize a Lighting Laird dimmable light."""
         super().__init__(hass, instance, light)
@@ -96,13 +132,34 @@ class LightingLairdLightDimmable(LightingLairdLight):
     @property
     def brightness(self) -> int:
         """Return the brightness of this light between 0..255."""
-        return round(self._data["brightness"])
+        return round(self._brightness)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on and optionally set the brightness."""
+        if kwargs.get(ATTR_TRANSITION):
+            if ATTR_BRIGHTNESS in kwargs:
+                target = round(kwargs[ATTR_BRIGHTNESS] * FULL_BRIGHTNESS / 255)
+            else:
+                target = self._api.lamp_on_brightness(self._id)
+            self._api.async_start_transition(
+                self._id, target, kwargs[ATTR_TRANSITION]
+            )
+            self.async_write_ha_state()
+            return
         if ATTR_BRIGHTNESS in kwargs:
-            return await self.async_update_value(round(kwargs[ATTR_BRIGHTNESS] / 2.55))
-        return await self.async_update_state(True)
+            update = self.async_update_value(round(kwargs[ATTR_BRIGHTNESS] / 2.55))
+            # show the target while it is written behind
+            self.async_write_ha_state()
+            return await update
+        return await super().async_turn_on(**kwargs)
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Turn the light off, fading out if a transition is given."""
+        if kwargs.get(ATTR_TRANSITION):
+            self._api.async_start_transition(self._id, 0, kwargs[ATTR_TRANSITION])
+            self.async_write_ha_state()
+            return
+        await super().async_turn_off(**kwargs)
 
 
 async def async_setup_entry(
@@ -110,21 +167,24 @@ async def async_setup_entry(
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
+    """Set up the lamps of a hub and add lamps which show up later on."""
     instance: LightingLairdData = hass.data[DOMAIN][config_entry.entry_id]
 
-    entities: list[LightEntity] = []
-    my_lights = instance.coordinator.data["Lamps"]
-    if my_lights is not None:
-        print(f"Got Lights: {my_lights}")
-        for light in my_lights:
-            if light is not None and light.get("dimmable") != 0:
+    @callback
+    def _add_lamps(lamps: Iterable[Lamp]) -> None:
+        entities: list[LightEntity] = []
+        for light in lamps:
+            if light.dimmable != 0:
                 entities.append(
                     LightingLairdLight(hass=hass, instance=instance, light=light)
                 )
-            elif light is not None:
+            else:
                 entities.append(
                     LightingLairdLightDimmable(
                         hass=hass, instance=instance, light=light
                     )
                 )
-    async_add_entities(entities)
+        async_add_entities(entities)
+
+    instance.api.async_set_lamp_add_listener(_add_lamps)
+    _add_lamps(instance.api.store.lamps())
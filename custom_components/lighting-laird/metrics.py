@@ -0,0 +1,160 @@
+"""Runtime metrics of the connection to a Lighting Laird hub."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+import time
+from typing import Any
+
+# Upper bounds in milliseconds of the round trip histogram buckets, the last
+# bucket counts everything above
+RTT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Decode time is measured for one frame out of DECODE_SAMPLE_EVERY
+DECODE_SAMPLE_EVERY = 16
+
+
+class RttHistogram:
+    """Histogram of round trip times with fixed logarithmic buckets."""
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts = array("L", [0] * (len(RTT_BUCKETS) + 1))
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add a round trip time."""
+        milliseconds = seconds * 1000
+        self.counts[bisect_left(RTT_BUCKETS, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the upper bound of the bucket holding the percentile.
+
+        None if nothing has been recorded, infinity if the percentile lies in
+        the overflow bucket.
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                break
+        return RTT_BUCKETS[index] if index < len(RTT_BUCKETS) else float("inf")
+
+    def merge(self, other: RttHistogram) -> None:
+        """Add the round trips recorded by other."""
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for diagnostics."""
+        overflow = f">{RTT_BUCKETS[-1]}ms"
+        buckets = [f"<={bound}ms" for bound in RTT_BUCKETS] + [overflow]
+
+        def bound(fraction):
+            value = self.percentile(fraction)
+            return overflow if value == float("inf") else value
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else None,
+            "p50_ms": bound(0.5),
+            "p95_ms": bound(0.95),
+            "p99_ms": bound(0.99),
+            "buckets": dict(zip(buckets, self.counts)),
+        }
+
+
+class LightingLairdMetrics:
+    """Counters collected by the reader and writer of a hub connection.
+
+    Everything on the reader path is a counter increment, the decode time is
+    only measured for a sample of the frames.
+    """
+
+    def __init__(self) -> None:
+        """Initialize all counters."""
+        self.frames: dict[str | None, int] = {}
+        self.frames_total = 0
+        self.decode_samples = 0
+        self.decode_ns = 0
+        self.rtt: dict[str, RttHistogram] = {}
+        self.reconnects = 0
+        self.last_frame_time: float | None = None
+
+    def record_frame(self, frame_type: str | None) -> None:
+        """Count a received frame."""
+        self.frames[frame_type] = self.frames.get(frame_type, 0) + 1
+        self.frames_total += 1
+        self.last_frame_time = time.monotonic()
+
+    def record_decode(self, nanoseconds: int) -> None:
+        """Add a sampled decode time."""
+        self.decode_samples += 1
+        self.decode_ns += nanoseconds
+
+    def record_rtt(self, frame_type: str, seconds: float) -> None:
+        """Add the round trip time of a request answered by frame_type."""
+        if (histogram := self.rtt.get(frame_type)) is None:
+            histogram = self.rtt[frame_type] = RttHistogram()
+        histogram.record(seconds)
+
+    @property
+    def decode_time(self) -> float | None:
+        """Return the mean decode time of a frame in microseconds."""
+        if not self.decode_samples:
+            return None
+        return self.decode_ns / self.decode_samples / 1000
+
+    @property
+    def seconds_since_last_frame(self) -> float | None:
+        """Return the seconds since the last frame has been received."""
+        if self.last_frame_time is None:
+            return None
+        return time.monotonic() - self.last_frame_time
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics for diagnostics."""
+        since = self.seconds_since_last_frame
+        return {
+            "frames": {str(key): value for key, value in self.frames.items()},
+            "frames_total": self.frames_total,
+            "decode_time_us": (
+                round(self.decode_time, 3) if self.decode_time is not None else None
+            ),
+            "rtt": {key: value.as_dict() for key, value in self.rtt.items()},
+            "reconnects": self.reconnects,
+            "seconds_since_last_frame": round(since, 3) if since is not None else None,
+        }
+
+
+def aggregate_metrics(all_metrics: Iterable[LightingLairdMetrics]) -> dict[str, Any]:
+    """Return the sum of the metrics of several hub connections."""
+    total = LightingLairdMetrics()
+    hubs = 0
+    for metrics in all_metrics:
+        hubs += 1
+        for frame_type, count in metrics.frames.items():
+            total.frames[frame_type] = total.frames.get(frame_type, 0) + count
+        total.frames_total += metrics.frames_total
+        total.decode_samples += metrics.decode_samples
+        total.decode_ns += metrics.decode_ns
+        for frame_type, histogram in metrics.rtt.items():
+            if (merged := total.rtt.get(frame_type)) is None:
+                merged = total.rtt[frame_type] = RttHistogram()
+            merged.merge(histogram)
+        total.reconnects += metrics.reconnects
+        if metrics.last_frame_time is not None and (
+            total.last_frame_time is None
+            or metrics.last_frame_time > total.last_frame_time
+        ):
+            total.last_frame_time = metrics.last_frame_time
+    return {"hubs": hubs, **total.as_dict()}
@@ -3,14 +3,15 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-
+from .coordinator import LightingLairdCoordinator
 from .lairdserver import LightingLairdDevices
+from .scene_store import LightingLairdSceneStore
 
 
 @dataclass
 class LightingLairdData:
     """Data for the Advantage Air integration."""
 
-    coordinator: DataUpdateCoordinator
+    coordinator: LightingLairdCoordinator
     api: LightingLairdDevices
+    scenes: LightingLairdSceneStore
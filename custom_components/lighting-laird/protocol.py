@@ -0,0 +1,180 @@
+"""Decoder for the frames sent by the Lighting Laird hub over the websocket.
+
+Frames are dispatched on their prefix. Brightness and button frames carry two
+integers which are parsed right away, snapshot frames carry a JSON body which
+is handed over unparsed so it is never tokenized and only copied once for the
+JSON decoder.
+
+Every decoded frame is a tuple (frame_type, key, payload):
+
+    "bl <lampId> <brightness>"  -> (FRAME_BRIGHTNESS, lampId, brightness)
+    "bs <buttonId> <state>"     -> (FRAME_BUTTON, buttonId, state)
+    "lampData <json>"           -> (FRAME_LAMP_DATA, None, json body)
+    "buttonData <json>"         -> (FRAME_BUTTON_DATA, None, json body)
+    anything else               -> (None, None, message)
+
+Snapshot bodies are decoded into Lamp and Button records with orjson if it is
+installed (it ships with Home Assistant) and the json module otherwise.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+FRAME_BRIGHTNESS = "bl"
+FRAME_BUTTON = "bs"
+FRAME_LAMP_DATA = "lampData"
+FRAME_BUTTON_DATA = "buttonData"
+
+_LAMP_DATA_LEN = len(FRAME_LAMP_DATA)
+_BUTTON_DATA_LEN = len(FRAME_BUTTON_DATA)
+
+# Upper bounds of brightness, button state and dimmable flag, the state store
+# keeps them in fixed size arrays
+MAX_BRIGHTNESS = 255
+MAX_STATE = 255
+MAX_DIMMABLE = 1
+
+
+def _ranged(value: Any, maximum: int, field: str) -> int:
+    """Return value as int, raise ValueError if it is not in 0..maximum."""
+    value = int(value)
+    if not 0 <= value <= maximum:
+        raise ValueError(f"{field} {value} out of range 0..{maximum}")
+    return value
+
+
+def decode_frame(message: str) -> tuple[str | None, int | None, object]:
+    """Decode a frame received from the hub.
+
+    Raises ValueError if a brightness or button frame is malformed or its
+    value is out of range.
+    """
+    if message.startswith("bl "):
+        _, lampId, brightness = message.split(" ", 2)
+        return (
+            FRAME_BRIGHTNESS,
+            int(lampId),
+            _ranged(brightness, MAX_BRIGHTNESS, "brightness"),
+        )
+    if message.startswith("bs "):
+        _, buttonId, state = message.split(" ", 2)
+        return FRAME_BUTTON, int(buttonId), _ranged(state, MAX_STATE, "state")
+    if message.startswith(FRAME_LAMP_DATA):
+        return FRAME_LAMP_DATA, None, message[_LAMP_DATA_LEN:]
+    if message.startswith(FRAME_BUTTON_DATA):
+        return FRAME_BUTTON_DATA, None, message[_BUTTON_DATA_LEN:]
+    return None, None, message
+
+
+def reply_key(msg: str) -> tuple[str, int | None] | None:
+    """Return the (frame_type, key) of the frame which answers the command msg.
+
+    Lamp commands are acknowledged by the "bl" echo of the lamp, the snapshot
+    requests by their data frame. None if the command has no reply.
+    """
+    args = msg.split()
+    if not args:
+        return None
+    if args[0] == "getAllLamps":
+        return FRAME_LAMP_DATA, None
+    if args[0] == "getAllButtons":
+        return FRAME_BUTTON_DATA, None
+    if args[0] in ("turn_on", "turn_off", "set_brightness") and len(args) > 1:
+        return FRAME_BRIGHTNESS, int(args[1])
+    return None
+
+
+class ProtocolError(ValueError):
+    """Raised if the hub sent data which doesn't match the protocol."""
+
+
+@dataclass(slots=True)
+class Lamp:
+    """Lamp as reported in a lampData snapshot."""
+
+    lamp_id: int
+    name: str
+    brightness: int
+    dimmable: int = 0
+
+
+@dataclass(slots=True)
+class Button:
+    """Button as reported in a buttonData snapshot."""
+
+    button_id: int
+    name: str
+    state: int = 0
+
+
+def lamp_from_dict(item: dict[str, Any]) -> Lamp:
+    """Validate a lamp of a lampData snapshot and return it as a record."""
+    return Lamp(
+        int(item["lampId"]),
+        str(item["name"]),
+        _ranged(item.get("brightness", 0), MAX_BRIGHTNESS, "brightness"),
+        _ranged(item.get("dimmable", 0), MAX_DIMMABLE, "dimmable"),
+    )
+
+
+def button_from_dict(item: dict[str, Any]) -> Button:
+    """Validate a button of a buttonData snapshot and return it as a record."""
+    return Button(
+        int(item["buttonId"]),
+        str(item["name"]),
+        _ranged(item.get("state", 0), MAX_STATE, "state"),
+    )
+
+
+def lamp_to_dict(lamp: Lamp) -> dict[str, Any]:
+    """Return a lamp in the format used by the hub."""
+    return {
+        "lampId": lamp.lamp_id,
+        "name": lamp.name,
+        "brightness": lamp.brightness,
+        "dimmable": lamp.dimmable,
+    }
+
+
+def button_to_dict(button: Button) -> dict[str, Any]:
+    """Return a button in the format used by the hub."""
+    return {
+        "buttonId": button.button_id,
+        "name": button.name,
+        "state": button.state,
+    }
+
+
+def decode_lamps(body: str) -> list[Lamp | None]:
+    """Decode the JSON body of a lampData frame.
+
+    The hub sends a list indexed by lampId which may contain null entries for
+    unused ids, these are kept as None. Raises ProtocolError if the body is
+    malformed.
+    """
+    try:
+        items = json_loads(body)
+        return [None if item is None else lamp_from_dict(item) for item in items]
+    except (TypeError, ValueError, KeyError) as err:
+        raise ProtocolError(f"Malformed lampData: {err}") from err
+
+
+def decode_buttons(body: str) -> dict[int, Button]:
+    """Decode the JSON body of a buttonData frame.
+
+    The hub sends an object keyed by the buttonId as string, the returned dict
+    is keyed by the integer buttonId. Raises ProtocolError if the body is
+    malformed.
+    """
+    try:
+        items = json_loads(body)
+        buttons = (button_from_dict(item) for item in items.values() if item)
+        return {button.button_id: button for button in buttons}
+    except (AttributeError, TypeError, ValueError, KeyError) as err:
+        raise ProtocolError(f"Malformed buttonData: {err}") from err
@@ -0,0 +1,72 @@
+"""Scene platform applying captured lamp levels as one batch."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.scene import Scene
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_platform, entity_registry as er
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, SERVICE_DELETE_SCENE
+from .models import LightingLairdData
+from .scene_store import LightingLairdScene
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the scenes of a hub and add scenes created later on."""
+    instance: LightingLairdData = hass.data[DOMAIN][config_entry.entry_id]
+
+    @callback
+    def _add_scene(scene: LightingLairdScene) -> None:
+        async_add_entities([LightingLairdSceneEntity(instance, scene)])
+
+    instance.scenes.async_set_add_listener(_add_scene)
+    async_add_entities(
+        LightingLairdSceneEntity(instance, scene)
+        for scene in instance.scenes.scenes.values()
+    )
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(SERVICE_DELETE_SCENE, {}, "async_delete")
+
+
+class LightingLairdSceneEntity(Scene):
+    """Representation of a captured brightness scene."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, instance: LightingLairdData, scene: LightingLairdScene) -> None:
+        """Initialize the scene."""
+        self._api = instance.api
+        self._scenes = instance.scenes
+        self._scene = scene
+        self._attr_name = scene.name
+        self._attr_unique_id = f"{instance.api.hub_id}-LairdScene-{scene.scene_id}"
+        self._attr_device_info = instance.api.hub_device_info
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the number of lamps in the scene."""
+        return {"lamps": len(self._scene.levels)}
+
+    async def async_activate(self, **kwargs: Any) -> None:
+        """Apply the levels of all lamps of the scene as one batch."""
+        try:
+            await self._api.async_apply_levels(self._scene.levels)
+        except OSError as err:
+            raise HomeAssistantError(err) from err
+
+    async def async_delete(self) -> None:
+        """Delete the scene and its entity."""
+        self._scenes.async_delete(self._scene.scene_id)
+        if self.registry_entry is not None:
+            er.async_get(self.hass).async_remove(self.entity_id)
+        else:
+            await self.async_remove()
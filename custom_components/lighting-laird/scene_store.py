@@ -0,0 +1,105 @@
+"""Persistent brightness scenes of a Lighting Laird hub."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+from typing import Any
+from uuid import uuid4
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+class LightingLairdScene:
+    """Brightness levels of a set of lamps captured from the state store."""
+
+    def __init__(self, scene_id: str, name: str, levels: dict[int, int]) -> None:
+        """Initialize the scene."""
+        self.scene_id = scene_id
+        self.name = name
+        self.levels = levels
+
+
+class LightingLairdSceneStore:
+    """Scenes of a config entry, saved with the Store helper."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the scene store of a config entry."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.scenes"
+        )
+        self.scenes: dict[str, LightingLairdScene] = {}
+        self._add_listener: Callable[[LightingLairdScene], None] | None = None
+
+    async def async_load(self) -> None:
+        """Load the saved scenes."""
+        if not (data := await self._store.async_load()):
+            return
+        for scene_id, item in data.items():
+            try:
+                levels = {
+                    int(key): int(value) for key, value in item["levels"].items()
+                }
+                self.scenes[scene_id] = LightingLairdScene(
+                    scene_id, item["name"], levels
+                )
+            except (KeyError, TypeError, ValueError) as err:
+                _LOGGER.warning("Ignoring invalid scene %s: %s", scene_id, err)
+
+    @callback
+    def async_set_add_listener(
+        self, add_listener: Callable[[LightingLairdScene], None]
+    ) -> None:
+        """Set the callback of the scene platform which adds new scenes."""
+        self._add_listener = add_listener
+
+    @callback
+    def async_create(self, name: str, levels: dict[int, int]) -> LightingLairdScene:
+        """Create a scene and add its entity.
+
+        A scene with the same name is replaced, so capturing a scene again
+        updates it.
+        """
+        for scene in self.scenes.values():
+            if scene.name == name:
+                scene.levels = levels
+                self._async_schedule_save()
+                return scene
+        scene = LightingLairdScene(uuid4().hex, name, levels)
+        self.scenes[scene.scene_id] = scene
+        self._async_schedule_save()
+        if self._add_listener is not None:
+            self._add_listener(scene)
+        return scene
+
+    @callback
+    def async_delete(self, scene_id: str) -> None:
+        """Forget a scene."""
+        if self.scenes.pop(scene_id, None) is not None:
+            self._async_schedule_save()
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the scenes soon."""
+        self._store.async_delay_save(self._data_to_save, 1)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the scenes to save."""
+        return {
+            scene.scene_id: {
+                "name": scene.name,
+                "levels": {str(key): value for key, value in scene.levels.items()},
+            }
+            for scene in self.scenes.values()
+        }
+
+    async def async_remove(self) -> None:
+        """Remove the scene file."""
+        await self._store.async_remove()
@@ -1,17 +1,36 @@
 """Sensor platform support for wiffi devices."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import DEGREE, LIGHT_LUX, UnitOfPressure, UnitOfTemperature
+from homeassistant.const import (
+    DEGREE,
+    LIGHT_LUX,
+    EntityCategory,
+    UnitOfPressure,
+    UnitOfTemperature,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
 
 from . import WiffiEntity
-from .const import CREATE_ENTITY_SIGNAL
+from .const import CREATE_ENTITY_SIGNAL, DOMAIN
+from .entity import LightingLairdEntity
+from .lairdserver import CONNECTION_STATES, LightingLairdWebSocketServer
+from .models import LightingLairdData
+from .protocol import FRAME_BRIGHTNESS
 from .wiffi_strings import (
     WIFFI_UOM_DEGREE,
     WIFFI_UOM_LUX,
@@ -20,6 +39,9 @@ from .wiffi_strings import (
     WIFFI_UOM_TEMP_CELSIUS,
 )
 
+# Interval in which the metric sensors read the connection metrics
+SCAN_INTERVAL = timedelta(seconds=30)
+
 # map to determine HA device class from wiffi's unit of measurement
 UOM_TO_DEVICE_CLASS_MAP = {
     WIFFI_UOM_TEMP_CELSIUS: SensorDeviceClass.TEMPERATURE,
@@ -37,6 +59,82 @@ UOM_MAP = {
 }
 
 
+def _command_rtt(server: LightingLairdWebSocketServer, fraction: float | None):
+    """Return the mean or a percentile of the lamp command round trips."""
+    if (histogram := server.metrics.rtt.get(FRAME_BRIGHTNESS)) is None:
+        return None
+    if fraction is None:
+        return round(histogram.total / histogram.count, 2)
+    value = histogram.percentile(fraction)
+    return value if value != float("inf") else None
+
+
+def _round(value: float | None, digits: int) -> float | None:
+    """Round value unless it is None."""
+    return round(value, digits) if value is not None else None
+
+
+@dataclass(frozen=True, kw_only=True)
+class LightingLairdMetricDescription(SensorEntityDescription):
+    """Describes a sensor reading a metric of the hub connection."""
+
+    value_fn: Callable[[LightingLairdWebSocketServer], StateType]
+
+
+METRIC_SENSORS: tuple[LightingLairdMetricDescription, ...] = (
+    LightingLairdMetricDescription(
+        key="frames_received",
+        translation_key="frames_received",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda server: server.metrics.frames_total,
+    ),
+    LightingLairdMetricDescription(
+        key="decode_time",
+        translation_key="decode_time",
+        native_unit_of_measurement=UnitOfTime.MICROSECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda server: _round(server.metrics.decode_time, 2),
+    ),
+    LightingLairdMetricDescription(
+        key="command_rtt_mean",
+        translation_key="command_rtt_mean",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda server: _command_rtt(server, None),
+    ),
+    LightingLairdMetricDescription(
+        key="command_rtt_p95",
+        translation_key="command_rtt_p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda server: _command_rtt(server, 0.95),
+    ),
+    LightingLairdMetricDescription(
+        key="reconnects",
+        translation_key="reconnects",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda server: server.metrics.reconnects,
+    ),
+    LightingLairdMetricDescription(
+        key="last_frame_age",
+        translation_key="last_frame_age",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda server: _round(server.metrics.seconds_since_last_frame, 1),
+    ),
+    LightingLairdMetricDescription(
+        key="queue_depth",
+        translation_key="queue_depth",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda server: server.queue_depth,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -49,26 +147,41 @@ async def async_setup_entry(
     """
 
     @callback
-    def _create_entity(device, metric):
-        """Create platform specific entities."""
+    def _create_entities(device, metrics):
+        """Create platform specific entities for the new metrics of a telegram."""
         entities = []
 
-        if metric.is_number:
-            entities.append(NumberEntity(device, metric, config_entry.options))
-        elif metric.is_string:
-            entities.append(StringEntity(device, metric, config_entry.options))
+        for metric in metrics:
+            if metric.is_number:
+                entities.append(NumberEntity(device, metric, config_entry))
+            elif metric.is_string:
+                entities.append(StringEntity(device, metric, config_entry))
+
+        if entities:
+            async_add_entities(entities)
 
-        async_add_entities(entities)
+    config_entry.async_on_unload(
+        async_dispatcher_connect(hass, CREATE_ENTITY_SIGNAL, _create_entities)
+    )
 
-    async_dispatcher_connect(hass, CREATE_ENTITY_SIGNAL, _create_entity)
+    instance: LightingLairdData = hass.data[DOMAIN][config_entry.entry_id]
+    async_add_entities(
+        [
+            LightingLairdConnectionSensor(instance),
+            *(
+                LightingLairdMetricSensor(instance, description)
+                for description in METRIC_SENSORS
+            ),
+        ]
+    )
 
 
 class NumberEntity(WiffiEntity, SensorEntity):
     """Entity for wiffi metrics which have a number value."""
 
-    def __init__(self, device, metric, options):
+    def __init__(self, device, metric, config_entry):
         """Initialize the entity."""
-        super().__init__(device, metric, options)
+        super().__init__(device, metric, config_entry)
         self._attr_device_class = UOM_TO_DEVICE_CLASS_MAP.get(
             metric.unit_of_measurement
         )
@@ -87,7 +200,7 @@ class NumberEntity(WiffiEntity, SensorEntity):
     @property
     def available(self):
         """Return true if value is valid."""
-        return self._attr_native_value is not None
+        return self._attr_available and self._attr_native_value is not None
 
     @callback
     def _update_value_callback(self, device, metric):
@@ -108,16 +221,16 @@ class NumberEntity(WiffiEntity, SensorEntity):
 class StringEntity(WiffiEntity, SensorEntity):
     """Entity for wiffi metrics which have a string value."""
 
-    def __init__(self, device, metric, options):
+    def __init__(self, device, metric, config_entry):
         """Initialize the entity."""
-        super().__init__(device, metric, options)
+        super().__init__(device, metric, config_entry)
         self._attr_native_value = metric.value
         self.reset_expiration_date()
 
     @property
     def available(self):
         """Return true if value is valid."""
-        return self._attr_native_value is not None
+        return self._attr_available and self._attr_native_value is not None
 
     @callback
     def _update_value_callback(self, device, metric):
@@ -128,3 +241,68 @@ class StringEntity(WiffiEntity, SensorEntity):
         self.reset_expiration_date()
         self._attr_native_value = metric.value
         self.async_write_ha_state()
+
+
+class LightingLairdConnectionSensor(LightingLairdEntity, SensorEntity):
+    """Diagnostic entity showing the state of the connection to the hub."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_options = CONNECTION_STATES
+    _attr_should_poll = False
+    _attr_translation_key = "connection"
+
+    def __init__(self, instance: LightingLairdData) -> None:
+        """Initialize the entity."""
+        super().__init__(instance)
+        self._server = instance.api.server
+        self._attr_unique_id = f"{self._hub_id}-LairdHub-connection"
+        self._attr_device_info = instance.api.hub_device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the connection state once added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._server.add_state_handler(self._async_state_change))
+
+    @callback
+    def _async_state_change(self, state: str) -> None:
+        """Write the new connection state."""
+        self.async_write_ha_state()
+
+    @property
+    def available(self) -> bool:
+        """Return True, the connection state is known even without the hub."""
+        return True
+
+    @property
+    def native_value(self) -> str:
+        """Return the state of the connection."""
+        return self._server.state
+
+
+class LightingLairdMetricSensor(SensorEntity):
+    """Diagnostic entity polling a metric of the hub connection.
+
+    The metrics are only counted on the hot path, these entities read them
+    every SCAN_INTERVAL. They are disabled by default.
+    """
+
+    entity_description: LightingLairdMetricDescription
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+
+    def __init__(
+        self, instance: LightingLairdData, description: LightingLairdMetricDescription
+    ) -> None:
+        """Initialize the entity."""
+        self.entity_description = description
+        self._server = instance.api.server
+        self._attr_unique_id = f"{instance.api.hub_id}-LairdHub-{description.key}"
+        self._attr_device_info = instance.api.hub_device_info
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the current value of the metric."""
+        return self.entity_description.value_fn(self._server)
@@ -0,0 +1,265 @@
+"""Indexed state store for the lamps and buttons of a Lighting Laird hub."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+
+from .protocol import Button, Lamp
+
+
+@dataclass(slots=True)
+class InventoryChanges:
+    """Ids added, removed and renamed by a snapshot."""
+
+    added: set[int] = field(default_factory=set)
+    removed: set[int] = field(default_factory=set)
+    renamed: set[int] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        """Return True if the inventory changed."""
+        return bool(self.added or self.removed or self.renamed)
+
+
+class _Table:
+    """Slot allocation for sparse ids with a version counter per slot.
+
+    Values live in array columns of the owning store indexed by slot, the
+    table maps the hub ids (which may have gaps) to these slots.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty table."""
+        self.slots: dict[int, int] = {}
+        self.versions = array("L")
+        self._free: list[int] = []
+        self._missing: set[int] = set()
+
+    def allocate(self, key: int, columns: Iterable[array]) -> int:
+        """Return the slot for key, appending a row to columns if needed."""
+        if (slot := self.slots.get(key)) is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self.versions)
+            self.versions.append(0)
+            for column in columns:
+                column.append(0)
+        self.slots[key] = slot
+        return slot
+
+    def release(self, key: int) -> None:
+        """Free the slot of key for reuse by another id."""
+        slot = self.slots.pop(key)
+        self.versions[slot] += 1
+        self._free.append(slot)
+
+    def stale(self, seen: set[int]) -> set[int]:
+        """Return the keys missing from this and the previous snapshot.
+
+        A key missing from a single snapshot is only remembered and an empty
+        snapshot is ignored, so a truncated snapshot removes nothing.
+        """
+        if not seen:
+            return set()
+        missing = self.slots.keys() - seen
+        stale = missing & self._missing
+        self._missing = missing - stale
+        return stale
+
+    def version(self, key: int) -> int:
+        """Return the version of key, -1 if key is unknown."""
+        if (slot := self.slots.get(key)) is None:
+            return -1
+        return self.versions[slot]
+
+
+class LightingLairdStateStore:
+    """State of all lamps and buttons of a hub.
+
+    Brightness levels and button states are held in array columns indexed by
+    a slot per id, names and other metadata in side tables. Every change of a
+    lamp or button increments its version so entities can cheaply check
+    whether they need to write their state.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self._lamps = _Table()
+        self._brightness = array("h")
+        self._dimmable = array("b")
+        self._lamp_names: dict[int, str] = {}
+        self._buttons = _Table()
+        self._button_state = array("h")
+        self._button_names: dict[int, str] = {}
+
+    def lamp_ids(self) -> list[int]:
+        """Return the ids of all known lamps."""
+        return list(self._lamps.slots)
+
+    def has_lamp(self, lampId: int) -> bool:
+        """Return True if the lamp is known."""
+        return lampId in self._lamps.slots
+
+    def lamp_version(self, lampId: int) -> int:
+        """Return the version of a lamp, -1 if it is unknown."""
+        return self._lamps.version(lampId)
+
+    def lamp_brightness(self, lampId: int) -> int:
+        """Return the brightness level of a lamp."""
+        return self._brightness[self._lamps.slots[lampId]]
+
+    def lamp_dimmable(self, lampId: int) -> int:
+        """Return the dimmable flag of a lamp as reported by the hub."""
+        return self._dimmable[self._lamps.slots[lampId]]
+
+    def lamp_name(self, lampId: int) -> str:
+        """Return the name of a lamp."""
+        return self._lamp_names[lampId]
+
+    def lamp(self, lampId: int) -> Lamp:
+        """Return a record of the current state of a lamp."""
+        slot = self._lamps.slots[lampId]
+        return Lamp(
+            lampId,
+            self._lamp_names[lampId],
+            self._brightness[slot],
+            self._dimmable[slot],
+        )
+
+    def lamps(self) -> Iterator[Lamp]:
+        """Return records of all lamps."""
+        return (self.lamp(lampId) for lampId in self._lamps.slots)
+
+    def set_lamp_brightness(self, lampId: int, brightness: int) -> bool:
+        """Store a brightness level, return True if it changed."""
+        if (slot := self._lamps.slots.get(lampId)) is None:
+            return False
+        if self._brightness[slot] == brightness:
+            return False
+        self._brightness[slot] = brightness
+        self._lamps.versions[slot] += 1
+        return True
+
+    def apply_lamps(
+        self, lamps: Iterable[Lamp | None], changes: InventoryChanges | None = None
+    ) -> set[int]:
+        """Replace all lamps by a snapshot, return the ids which changed.
+
+        Added, removed and renamed lamps are also recorded in changes. Lamps
+        are only removed once they are missing from two snapshots in a row.
+        """
+        table = self._lamps
+        changed = set()
+        seen = set()
+        for lamp in lamps:
+            if lamp is None:
+                continue
+            lampId = lamp.lamp_id
+            seen.add(lampId)
+            if (slot := table.slots.get(lampId)) is None:
+                slot = table.allocate(lampId, (self._brightness, self._dimmable))
+                if changes is not None:
+                    changes.added.add(lampId)
+            elif (
+                self._brightness[slot] == lamp.brightness
+                and self._dimmable[slot] == lamp.dimmable
+                and self._lamp_names[lampId] == lamp.name
+            ):
+                continue
+            elif changes is not None and self._lamp_names[lampId] != lamp.name:
+                changes.renamed.add(lampId)
+            self._lamp_names[lampId] = lamp.name
+            self._brightness[slot] = lamp.brightness
+            self._dimmable[slot] = lamp.dimmable
+            table.versions[slot] += 1
+            changed.add(lampId)
+
+        for lampId in table.stale(seen):
+            table.release(lampId)
+            del self._lamp_names[lampId]
+            changed.add(lampId)
+            if changes is not None:
+                changes.removed.add(lampId)
+        return changed
+
+    def button_ids(self) -> list[int]:
+        """Return the ids of all known buttons."""
+        return list(self._buttons.slots)
+
+    def has_button(self, buttonId: int) -> bool:
+        """Return True if the button is known."""
+        return buttonId in self._buttons.slots
+
+    def button_version(self, buttonId: int) -> int:
+        """Return the version of a button, -1 if it is unknown."""
+        return self._buttons.version(buttonId)
+
+    def button_state(self, buttonId: int) -> int:
+        """Return the state of a button."""
+        return self._button_state[self._buttons.slots[buttonId]]
+
+    def button_name(self, buttonId: int) -> str:
+        """Return the name of a button."""
+        return self._button_names[buttonId]
+
+    def button(self, buttonId: int) -> Button:
+        """Return a record of the current state of a button."""
+        return Button(
+            buttonId,
+            self._button_names[buttonId],
+            self._button_state[self._buttons.slots[buttonId]],
+        )
+
+    def buttons(self) -> Iterator[Button]:
+        """Return records of all buttons."""
+        return (self.button(buttonId) for buttonId in self._buttons.slots)
+
+    def set_button_state(self, buttonId: int, state: int) -> bool:
+        """Store a button state, return True if it changed."""
+        if (slot := self._buttons.slots.get(buttonId)) is None:
+            return False
+        if self._button_state[slot] == state:
+            return False
+        self._button_state[slot] = state
+        self._buttons.versions[slot] += 1
+        return True
+
+    def apply_buttons(
+        self, buttons: Iterable[Button], changes: InventoryChanges | None = None
+    ) -> set[int]:
+        """Replace all buttons by a snapshot, return the ids which changed.
+
+        Added, removed and renamed buttons are also recorded in changes. Buttons
+        are only removed once they are missing from two snapshots in a row.
+        """
+        table = self._buttons
+        changed = set()
+        seen = set()
+        for button in buttons:
+            buttonId = button.button_id
+            seen.add(buttonId)
+            if (slot := table.slots.get(buttonId)) is None:
+                slot = table.allocate(buttonId, (self._button_state,))
+                if changes is not None:
+                    changes.added.add(buttonId)
+            elif (
+                self._button_state[slot] == button.state
+                and self._button_names[buttonId] == button.name
+            ):
+                continue
+            elif changes is not None and self._button_names[buttonId] != button.name:
+                changes.renamed.add(buttonId)
+            self._button_names[buttonId] = button.name
+            self._button_state[slot] = button.state
+            table.versions[slot] += 1
+            changed.add(buttonId)
+
+        for buttonId in table.stale(seen):
+            table.release(buttonId)
+            del self._button_names[buttonId]
+            changed.add(buttonId)
+            if changes is not None:
+                changes.removed.add(buttonId)
+        return changed
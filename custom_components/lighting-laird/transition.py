@@ -0,0 +1,110 @@
+"""Brightness ramps for light transitions, driven by one shared scheduler."""
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from . import LightingLairdIntegrationApi
+
+# Key of the transition scheduler in hass.data
+DATA_TRANSITIONS = f"{DOMAIN}_transitions"
+
+# Brightness frames per second sent for lamps in a transition
+TRANSITION_FRAME_RATE = 5
+
+
+class _Ramp:
+    """Linear brightness ramp of one lamp."""
+
+    __slots__ = ("begin", "duration", "last", "start", "target")
+
+    def __init__(self, begin: float, duration: float, start: int, target: int) -> None:
+        """Initialize the ramp."""
+        self.begin = begin
+        self.duration = duration
+        self.start = start
+        self.target = target
+        self.last = start
+
+
+class LightingLairdTransitions:
+    """Scheduler stepping all active brightness ramps of the integration.
+
+    All ramps share one timer ticking at TRANSITION_FRAME_RATE. The levels of
+    one tick are handed to each API at once, so they are queued in the same
+    event loop iteration and go out as one batch per hub. Lamps whose level
+    didn't change since the last tick are skipped.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._ramps: dict[tuple[LightingLairdIntegrationApi, int], _Ramp] = {}
+        self._timer: asyncio.TimerHandle | None = None
+
+    @callback
+    def async_start(
+        self,
+        api: LightingLairdIntegrationApi,
+        lampId: int,
+        start: int,
+        target: int,
+        duration: float,
+    ) -> None:
+        """Ramp a lamp from start to target over duration seconds."""
+        self._ramps[api, lampId] = _Ramp(self.hass.loop.time(), duration, start, target)
+        if self._timer is None:
+            self._timer = self.hass.loop.call_later(
+                1 / TRANSITION_FRAME_RATE, self._async_tick
+            )
+
+    @callback
+    def async_cancel(self, api: LightingLairdIntegrationApi, lampId: int) -> bool:
+        """Stop the ramp of a lamp, return True if there was one."""
+        return self._ramps.pop((api, lampId), None) is not None
+
+    @callback
+    def async_cancel_all(self, api: LightingLairdIntegrationApi) -> None:
+        """Stop all ramps of an API, e.g. when its entry is unloaded."""
+        for key in [key for key in self._ramps if key[0] is api]:
+            del self._ramps[key]
+
+    @callback
+    def _async_tick(self) -> None:
+        """Send the current level of every ramp, grouped by API."""
+        now = self.hass.loop.time()
+        levels: dict[LightingLairdIntegrationApi, dict[int, int]] = {}
+        finished: dict[LightingLairdIntegrationApi, list[int]] = {}
+        for (api, lampId), ramp in list(self._ramps.items()):
+            progress = min(1.0, (now - ramp.begin) / ramp.duration)
+            level = round(ramp.start + (ramp.target - ramp.start) * progress)
+            if progress >= 1.0:
+                del self._ramps[api, lampId]
+                finished.setdefault(api, []).append(lampId)
+            elif level == ramp.last:
+                continue
+            ramp.last = level
+            levels.setdefault(api, {})[lampId] = level
+
+        for api, api_levels in levels.items():
+            api.async_send_ramp_levels(api_levels, finished.get(api, ()))
+
+        if self._ramps:
+            self._timer = self.hass.loop.call_later(
+                1 / TRANSITION_FRAME_RATE, self._async_tick
+            )
+        else:
+            self._timer = None
+
+
+@callback
+def async_get_transitions(hass: HomeAssistant) -> LightingLairdTransitions:
+    """Return the transition scheduler stored in hass.data."""
+    if (transitions := hass.data.get(DATA_TRANSITIONS)) is None:
+        transitions = hass.data[DATA_TRANSITIONS] = LightingLairdTransitions(hass)
+    return transitions
@@ -0,0 +1,156 @@
+"""End-to-end latency benchmark against the local hub simulator.
+
+Connects LightingLairdWebSocketServer to a HubSimulator over a real
+websocket and measures for every installation size:
+
+    rtt        command -> bl echo round trip of set_brightness
+    snapshot   getAllLamps -> lampData round trip
+    event      pushed bl frame -> brightness written to the state store
+    frames/s   bl frames the reader decodes and applies per second
+
+The state write is the LightingLairdStateStore update the integration does
+for every bl frame before the entity state is written, Home Assistant itself
+is not needed.
+
+Usage: python scripts/benchmark_hub.py [--lamps 10 100 1000] [--samples N]
+       [--frames N] [--latency MS]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+from pathlib import Path
+import statistics
+import sys
+import time
+import types
+
+from hub_simulator import FULL_BRIGHTNESS, HubSimulator
+
+COMPONENT = (
+    Path(__file__).resolve().parent.parent / "custom_components" / "lighting-laird"
+)
+
+
+def _load_integration():
+    """Import the Home Assistant free modules of the integration."""
+    package = types.ModuleType("lighting_laird")
+    package.__path__ = [str(COMPONENT)]
+    sys.modules["lighting_laird"] = package
+    return (
+        importlib.import_module("lighting_laird.lairdserver"),
+        importlib.import_module("lighting_laird.protocol"),
+        importlib.import_module("lighting_laird.store"),
+    )
+
+
+def _percentiles(samples):
+    """Return p50, p95 and p99 of samples in milliseconds."""
+    if len(samples) < 2:
+        return (samples[0] * 1000,) * 3 if samples else (0.0,) * 3
+    quantiles = statistics.quantiles(samples, n=100)
+    return quantiles[49] * 1000, quantiles[94] * 1000, quantiles[98] * 1000
+
+
+async def _run(lamps, args, lairdserver, protocol, store_module):
+    """Benchmark one installation size, return a row of results."""
+    simulator = HubSimulator(lamps=lamps, buttons=max(1, lamps // 4))
+    simulator.latency = args.latency / 1000
+    port = await simulator.start()
+    server = lairdserver.LightingLairdWebSocketServer(f"127.0.0.1:{port}")
+    await server.start_server()
+
+    store = store_module.LightingLairdStateStore()
+    store.apply_lamps(protocol.decode_lamps((await server.sendMsg("getAllLamps"))[2]))
+
+    event_latencies = []
+    counted = [0]
+    push_times = simulator.push_times
+
+    def handle_frame(frame, resolved):
+        if frame[0] == protocol.FRAME_BRIGHTNESS:
+            store.set_lamp_brightness(frame[1], frame[2])
+            if (pushed := push_times.pop((frame[1], frame[2]), None)) is not None:
+                event_latencies.append(time.perf_counter() - pushed)
+            counted[0] += 1
+
+    server.add_frame_handler(handle_frame)
+    reader = asyncio.create_task(server.run_reader())
+    lamp_ids = simulator.lamp_ids
+
+    try:
+        rtts = []
+        for sample in range(args.samples):
+            lampId = lamp_ids[sample % len(lamp_ids)]
+            start = time.perf_counter()
+            await server.sendMsg(f"set_brightness {lampId} {sample % FULL_BRIGHTNESS}")
+            rtts.append(time.perf_counter() - start)
+
+        snapshots = []
+        for _ in range(max(1, args.samples // 20)):
+            start = time.perf_counter()
+            await server.sendMsg("getAllLamps", lairdserver.PRIORITY_REFRESH)
+            snapshots.append(time.perf_counter() - start)
+
+        event_latencies.clear()
+        push_times.clear()
+        for sample in range(args.samples):
+            simulator.push_brightness(
+                lamp_ids[sample % len(lamp_ids)], sample % 200 + 1
+            )
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.1)
+        events = list(event_latencies)
+
+        counted[0] = 0
+        push_times.clear()
+        start = time.perf_counter()
+        for frame in range(args.frames):
+            lampId = lamp_ids[frame % len(lamp_ids)]
+            simulator.push(f"bl {lampId} {frame % FULL_BRIGHTNESS}")
+        while counted[0] < args.frames and time.perf_counter() - start < 30:
+            await asyncio.sleep(0.001)
+        rate = counted[0] / (time.perf_counter() - start)
+    finally:
+        reader.cancel()
+        await server.close_server()
+        await simulator.stop()
+
+    return (
+        lamps,
+        *_percentiles(rtts),
+        statistics.mean(snapshots) * 1000,
+        *_percentiles(events),
+        rate,
+    )
+
+
+async def _main(args):
+    """Run the benchmark for every installation size and print a table."""
+    modules = _load_integration()
+    print(
+        f"{'lamps':>6} {'rtt p50':>9} {'p95':>7} {'p99':>7} {'snapshot':>9}"
+        f" {'event p50':>10} {'p95':>7} {'p99':>7} {'frames/s':>10}"
+    )
+    for lamps in args.lamps:
+        row = await _run(lamps, args, *modules)
+        print(
+            f"{row[0]:>6} {row[1]:>7.2f}ms {row[2]:>5.2f}ms {row[3]:>5.2f}ms"
+            f" {row[4]:>7.2f}ms {row[5]:>8.2f}ms {row[6]:>5.2f}ms {row[7]:>5.2f}ms"
+            f" {row[8]:>10,.0f}"
+        )
+
+
+def main():
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lamps", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.0, help="milliseconds")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Micro-benchmark for the Lighting Laird frame decoder.
+
+Measures decoded frames per second for every frame type of the hub protocol
+and compares them with splitting the whole frame on spaces first. The
+snapshot bodies are also decoded into Lamp and Button records and compared
+with parsing them into plain dicts with the json module.
+
+Usage: python scripts/benchmark_protocol.py [--lamps N] [--seconds S]
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+from pathlib import Path
+import sys
+import time
+
+COMPONENT = (
+    Path(__file__).resolve().parent.parent / "custom_components" / "lighting-laird"
+)
+
+
+def _load_protocol():
+    """Load protocol.py without importing the Home Assistant integration."""
+    spec = importlib.util.spec_from_file_location(
+        "lighting_laird_protocol", COMPONENT / "protocol.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses look the module up while the records are created
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _split_decode(message):
+    """Decode a frame the way the reader did before the protocol module."""
+    msgArgs = message.split(" ")
+    if msgArgs[0] in ("bl", "bs"):
+        return msgArgs[0], int(msgArgs[1]), int(msgArgs[2])
+    if msgArgs[0] == "lampData":
+        return msgArgs[0], None, message[8:]
+    if msgArgs[0] == "buttonData":
+        return msgArgs[0], None, message[10:]
+    return None, None, message
+
+
+def _frames(lamps):
+    """Return a sample frame of every type for an installation of lamps."""
+    lampData = [
+        {"lampId": i, "name": f"Lamp {i}", "brightness": i % 255, "dimmable": i % 2}
+        for i in range(lamps)
+    ]
+    buttonData = {
+        str(i): {"buttonId": i, "name": f"Button {i}", "state": 0}
+        for i in range(lamps // 4)
+    }
+    return {
+        "bl": "bl 123 200",
+        "bs": "bs 17 1",
+        "lampData": "lampData " + json.dumps(lampData),
+        "buttonData": "buttonData " + json.dumps(buttonData),
+    }
+
+
+def _rate(decode, message, seconds):
+    """Return how many times per second decode can process message."""
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            decode(message)
+        count += 100
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    """Run the benchmark and print frames/sec for every frame type."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lamps", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    protocol = _load_protocol()
+    print(f"{'frame':<12}{'bytes':>10}{'decode_frame/s':>18}{'split/s':>14}")
+    for name, message in _frames(args.lamps).items():
+        assert protocol.decode_frame(message) == _split_decode(message)
+        print(
+            f"{name:<12}{len(message):>10}"
+            f"{_rate(protocol.decode_frame, message, args.seconds):>18,.0f}"
+            f"{_rate(_split_decode, message, args.seconds):>14,.0f}"
+        )
+
+    frames = _frames(args.lamps)
+    snapshots = {
+        "lampData": protocol.decode_lamps,
+        "buttonData": protocol.decode_buttons,
+    }
+    print()
+    print(f"{'snapshot':<12}{'records':>10}{'records/s':>18}{'json/s':>14}")
+    for name, decode in snapshots.items():
+        body = protocol.decode_frame(frames[name])[2]
+        records = len(decode(body))
+        print(
+            f"{name:<12}{records:>10}"
+            f"{_rate(decode, body, args.seconds) * records:>18,.0f}"
+            f"{_rate(json.loads, body, args.seconds) * records:>14,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Local stand-in for a Lighting Laird hub.
+
+Serves the hub protocol at ws://HOST:PORT/ws so the integration and the
+benchmarks can run without the physical hub:
+
+    ping                        -> pong
+    getAllLamps                 -> lampData <json>
+    getAllButtons               -> buttonData <json>
+    turn_on <lampId>            -> bl <lampId> 254 to all clients
+    turn_off <lampId>           -> bl <lampId> 0 to all clients
+    set_brightness <lampId> <b> -> bl <lampId> <b> to all clients
+
+Random brightness and button changes are pushed as bl/bs frames at the
+configured event rate, and a lampData/buttonData snapshot every so often.
+Latency is added to every reply and all clients can be disconnected
+periodically to exercise reconnects.
+
+Usage: python scripts/hub_simulator.py [--lamps N] [--buttons N]
+       [--event-rate R] [--latency MS] [--disconnect-every S] [--port P]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+
+import websockets
+
+_LOGGER = logging.getLogger(__name__)
+
+FULL_BRIGHTNESS = 254
+
+# Pushed events between two pushed snapshots
+SNAPSHOT_EVERY = 100
+
+
+class HubSimulator:
+    """Websocket server which behaves like a Lighting Laird hub."""
+
+    def __init__(
+        self,
+        lamps=10,
+        buttons=4,
+        event_rate=0.0,
+        latency=0.0,
+        disconnect_every=0.0,
+    ):
+        """Initialize the simulator.
+
+        The hub numbers lamps from 1, lampData is indexed by lampId and has a
+        null entry at index 0. event_rate is in events per second, latency
+        and disconnect_every in seconds, 0 disables them.
+        """
+        self.lamps = [None] + [
+            {"lampId": i, "name": f"Lamp {i}", "brightness": 0, "dimmable": i % 2}
+            for i in range(1, lamps + 1)
+        ]
+        self.buttons = {
+            str(i): {"buttonId": i, "name": f"Button {i}", "state": 0}
+            for i in range(1, buttons + 1)
+        }
+        self.event_rate = event_rate
+        self.latency = latency
+        self.disconnect_every = disconnect_every
+        self.clients = set()
+        # perf_counter() of every pushed bl frame by (lampId, brightness)
+        self.push_times = {}
+        self.frames_sent = 0
+        self._server = None
+        self._tasks = []
+
+    @property
+    def lamp_ids(self):
+        """Return the ids of all lamps."""
+        return [lamp["lampId"] for lamp in self.lamps if lamp is not None]
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start serving, return the port which is listened on."""
+        self._server = await websockets.serve(self._handler, host, port)
+        if self.event_rate:
+            self._tasks.append(asyncio.create_task(self._run_events()))
+        if self.disconnect_every:
+            self._tasks.append(asyncio.create_task(self._run_disconnects()))
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop the background tasks and the server."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handler(self, websocket):
+        """Serve one client connection."""
+        if websocket.request.path != "/ws":
+            await websocket.close(1008, "unknown path")
+            return
+        self.clients.add(websocket)
+        try:
+            async for message in websocket:
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if (reply := self._handle(message)) is not None:
+                    await websocket.send(reply)
+                    self.frames_sent += 1
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.clients.discard(websocket)
+
+    def _handle(self, message):
+        """Execute a command, return the reply to the sender or None."""
+        args = message.split()
+        if not args:
+            return None
+        if args[0] == "ping":
+            return "pong"
+        if args[0] == "getAllLamps":
+            return self.lamp_data()
+        if args[0] == "getAllButtons":
+            return self.button_data()
+        try:
+            if args[0] == "turn_on":
+                self.push_brightness(int(args[1]), FULL_BRIGHTNESS)
+            elif args[0] == "turn_off":
+                self.push_brightness(int(args[1]), 0)
+            elif args[0] == "set_brightness":
+                self.push_brightness(int(args[1]), int(args[2]))
+            else:
+                _LOGGER.warning("Unknown command %s", message)
+        except (IndexError, ValueError):
+            _LOGGER.warning("Malformed command %s", message)
+        return None
+
+    def lamp_data(self):
+        """Return a lampData frame of all lamps."""
+        return "lampData " + json.dumps(self.lamps)
+
+    def button_data(self):
+        """Return a buttonData frame of all buttons."""
+        return "buttonData " + json.dumps(self.buttons)
+
+    def push(self, frame):
+        """Send a frame to all connected clients."""
+        websockets.broadcast(self.clients, frame)
+        self.frames_sent += len(self.clients)
+
+    def push_brightness(self, lampId, brightness):
+        """Change the brightness of a lamp and push the bl frame."""
+        if 0 < lampId < len(self.lamps) and self.lamps[lampId] is not None:
+            self.lamps[lampId]["brightness"] = brightness
+        self.push_times[lampId, brightness] = time.perf_counter()
+        self.push(f"bl {lampId} {brightness}")
+
+    def push_button(self, buttonId, state):
+        """Change the state of a button and push the bs frame."""
+        if (button := self.buttons.get(str(buttonId))) is not None:
+            button["state"] = state
+        self.push(f"bs {buttonId} {state}")
+
+    def push_snapshot(self):
+        """Push the lampData and buttonData snapshots."""
+        self.push(self.lamp_data())
+        self.push(self.button_data())
+
+    async def _run_events(self):
+        """Push random lamp and button changes at the event rate."""
+        lamp_ids = self.lamp_ids
+        button_ids = [int(buttonId) for buttonId in self.buttons]
+        count = 0
+        while True:
+            await asyncio.sleep(random.expovariate(self.event_rate))
+            if button_ids and random.random() < 0.2:
+                self.push_button(random.choice(button_ids), random.randint(0, 1))
+            elif lamp_ids:
+                self.push_brightness(
+                    random.choice(lamp_ids), random.randint(0, FULL_BRIGHTNESS)
+                )
+            count += 1
+            if count % SNAPSHOT_EVERY == 0:
+                self.push_snapshot()
+
+    async def _run_disconnects(self):
+        """Drop all client connections every disconnect_every seconds."""
+        while True:
+            await asyncio.sleep(self.disconnect_every)
+            _LOGGER.info("Disconnecting %d clients", len(self.clients))
+            for websocket in list(self.clients):
+                await websocket.close(1012, "simulated restart")
+
+
+async def _serve(args):
+    """Run the simulator until interrupted."""
+    simulator = HubSimulator(
+        lamps=args.lamps,
+        buttons=args.buttons,
+        event_rate=args.event_rate,
+        latency=args.latency / 1000,
+        disconnect_every=args.disconnect_every,
+    )
+    port = await simulator.start(args.host, args.port)
+    _LOGGER.info("Lighting Laird hub simulator at ws://%s:%d/ws", args.host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+def main():
+    """Parse the arguments and run the simulator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--lamps", type=int, default=10)
+    parser.add_argument("--buttons", type=int, default=4)
+    parser.add_argument("--event-rate", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.0, help="milliseconds")
+    parser.add_argument("--disconnect-every", type=float, default=0.0, help="seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
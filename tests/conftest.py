@@ -0,0 +1,47 @@
+"""Load the modules of the integration for the tests.
+
+The integration package imports Home Assistant, so the tests import its
+protocol, store and connection modules through a bare package instead, the
+same way the benchmarks in scripts/ do. Tests of the API itself run the
+package __init__ on top, they are skipped without Home Assistant.
+"""
+from __future__ import annotations
+
+import importlib
+import importlib.util
+from pathlib import Path
+import sys
+import types
+
+ROOT = Path(__file__).resolve().parent.parent
+COMPONENT = ROOT / "custom_components" / "lighting-laird"
+
+sys.path.insert(0, str(ROOT / "scripts"))
+
+
+def _package() -> types.ModuleType:
+    """Return the package of the integration without running its __init__."""
+    if (package := sys.modules.get("lighting_laird")) is None:
+        spec = importlib.util.spec_from_file_location(
+            "lighting_laird",
+            COMPONENT / "__init__.py",
+            submodule_search_locations=[str(COMPONENT)],
+        )
+        package = sys.modules["lighting_laird"] = importlib.util.module_from_spec(
+            spec
+        )
+    return package
+
+
+def load(name: str) -> types.ModuleType:
+    """Import a module of the integration without its package __init__."""
+    _package()
+    return importlib.import_module(f"lighting_laird.{name}")
+
+
+def load_integration() -> types.ModuleType:
+    """Run the package __init__ of the integration and return the package."""
+    package = _package()
+    if not hasattr(package, "LightingLairdIntegrationApi"):
+        package.__spec__.loader.exec_module(package)
+    return package
@@ -0,0 +1,208 @@
+"""Tests for the hub connection, run against the local hub simulator."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from conftest import load
+
+pytest.importorskip("websockets")
+
+lairdserver = load("lairdserver")
+protocol = load("protocol")
+
+from hub_simulator import HubSimulator  # noqa: E402
+
+reconnect_delay = lairdserver.reconnect_delay
+
+
+@pytest.fixture(autouse=True)
+def fast_reconnect(monkeypatch):
+    """Reconnect right away instead of backing off for seconds."""
+    monkeypatch.setattr(lairdserver, "reconnect_delay", lambda attempt: 0.01)
+
+
+async def _until(predicate, timeout=2):
+    """Wait until predicate() is true."""
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.005)
+
+
+class _Hub:
+    """Simulator and a connection to it with a running reader."""
+
+    async def __aenter__(self):
+        self.simulator = HubSimulator(lamps=4, buttons=2)
+        port = await self.simulator.start()
+        self.server = lairdserver.LightingLairdWebSocketServer(f"127.0.0.1:{port}")
+        self.frames = []
+        self.server.add_frame_handler(lambda frame, _: self.frames.append(frame))
+        await self.server.start_server()
+        self.reader = asyncio.create_task(self.server.run_reader())
+        await _until(lambda: self.server.disableRecv)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.reader.cancel()
+        await asyncio.gather(self.reader, return_exceptions=True)
+        await self.server.close_server()
+        await self.simulator.stop()
+
+    async def drop_clients(self):
+        """Let the simulator close all client connections."""
+        for websocket in list(self.simulator.clients):
+            await websocket.close(1012, "simulated restart")
+        await _until(lambda: not self.server.connected)
+
+
+def test_requests_are_correlated():
+    """Concurrent requests each get the reply frame matching their command."""
+
+    async def run():
+        async with _Hub() as hub:
+            replies = await asyncio.gather(
+                *(
+                    hub.server.request(f"set_brightness  {lampId} {lampId * 10}")
+                    for lampId in (1, 2, 3, 4)
+                ),
+                hub.server.request("getAllLamps"),
+            )
+            assert replies[:4] == [
+                (protocol.FRAME_BRIGHTNESS, lampId, lampId * 10)
+                for lampId in (1, 2, 3, 4)
+            ]
+            assert replies[4][0] == protocol.FRAME_LAMP_DATA
+            lamps = protocol.decode_lamps(replies[4][2])
+            assert [lamp.brightness for lamp in lamps if lamp] == [10, 20, 30, 40]
+            assert not hub.server.pending_requests
+
+    asyncio.run(run())
+
+
+def test_commands_go_before_refreshes_and_refreshes_merge():
+    """Queued refreshes are merged and commands overtake them."""
+
+    async def run():
+        server = lairdserver.LightingLairdWebSocketServer("127.0.0.1:1")
+        first = server.enqueue_nowait("getAllLamps", lairdserver.PRIORITY_REFRESH)
+        second = server.enqueue_nowait("getAllLamps", lairdserver.PRIORITY_REFRESH)
+        server.enqueue_nowait("turn_on  1")
+        server.enqueue_nowait("turn_off  2")
+        assert first is second
+        assert server.queue_depth == 3
+        assert [entry[2] for entry in sorted(server._queue)] == [
+            "turn_on  1",
+            "turn_off  2",
+            "getAllLamps",
+        ]
+        await server.close_server()
+        assert first.cancelled()
+        assert server.queue_depth == 0
+
+    asyncio.run(run())
+
+
+def test_full_queue_raises():
+    """A full outbound queue rejects further frames."""
+
+    async def run():
+        server = lairdserver.LightingLairdWebSocketServer("127.0.0.1:1")
+        for lampId in range(lairdserver.QUEUE_SIZE):
+            server.enqueue_nowait(f"turn_on  {lampId}")
+        with pytest.raises(lairdserver.CommandQueueFull):
+            server.enqueue_nowait("turn_on  999")
+        await server.close_server()
+
+    asyncio.run(run())
+
+
+def test_close_fails_senders_waiting_for_space():
+    """Closing the connection wakes senders waiting for a full queue."""
+
+    async def run():
+        server = lairdserver.LightingLairdWebSocketServer("127.0.0.1:1")
+        for lampId in range(lairdserver.QUEUE_SIZE):
+            server.enqueue_nowait(f"turn_on  {lampId}")
+        waiting = asyncio.create_task(server.enqueue("turn_on  999"))
+        await asyncio.sleep(0)
+        await server.close_server()
+        async with asyncio.timeout(1):
+            with pytest.raises(ConnectionError):
+                await waiting
+
+    asyncio.run(run())
+
+
+def test_close_while_reader_runs():
+    """The reader dropping the lost connection doesn't break close_server."""
+
+    async def run():
+        async with _Hub() as hub:
+            await hub.server.close_server()
+            assert hub.server.state == lairdserver.STATE_CLOSED
+
+    asyncio.run(run())
+
+
+def test_command_is_held_during_reconnect():
+    """A command sent while the hub is away goes out after the reconnect."""
+
+    async def run():
+        async with _Hub() as hub:
+            await hub.drop_clients()
+            assert hub.server.state == lairdserver.STATE_DEGRADED
+            reply = await hub.server.request("set_brightness  2 77", timeout=2)
+            assert reply == (protocol.FRAME_BRIGHTNESS, 2, 77)
+            assert hub.server.state == lairdserver.STATE_OPEN
+            assert hub.server.metrics.reconnects == 1
+            # the old socket has been released on the hub
+            assert len(hub.simulator.clients) == 1
+
+    asyncio.run(run())
+
+
+def test_reconnect_requests_snapshots():
+    """Missed pushes are caught up with one snapshot after a reconnect."""
+
+    async def run():
+        async with _Hub() as hub:
+            await hub.drop_clients()
+            await _until(
+                lambda: {protocol.FRAME_LAMP_DATA, protocol.FRAME_BUTTON_DATA}
+                <= {frame[0] for frame in hub.frames}
+            )
+
+    asyncio.run(run())
+
+
+def test_handler_error_keeps_connection():
+    """A failing frame handler doesn't drop the connection."""
+
+    async def run():
+        async with _Hub() as hub:
+
+            def failing_handler(frame, resolved):
+                raise OverflowError("handler failed")
+
+            hub.server.add_frame_handler(failing_handler)
+            hub.simulator.push("bl 1 99999")
+            hub.simulator.push("bl 1 50")
+            await _until(lambda: (protocol.FRAME_BRIGHTNESS, 1, 50) in hub.frames)
+            assert (protocol.FRAME_BRIGHTNESS, 1, 99999) not in hub.frames
+            assert hub.server.metrics.reconnects == 0
+            assert len(hub.simulator.clients) == 1
+
+    asyncio.run(run())
+
+
+def test_reconnect_delay_backs_off_with_jitter():
+    """The delay doubles per attempt up to the maximum, half of it random."""
+    for attempt in range(16):
+        delay = min(
+            lairdserver.RECONNECT_MAX_DELAY,
+            lairdserver.RECONNECT_MIN_DELAY * 2**attempt,
+        )
+        for _ in range(20):
+            assert delay / 2 <= reconnect_delay(attempt) <= delay
@@ -0,0 +1,80 @@
+"""Tests for the frame decoder."""
+from __future__ import annotations
+
+import pytest
+
+from conftest import load
+
+protocol = load("protocol")
+
+
+def test_decode_push_frames():
+    """Brightness and button frames are parsed into integers."""
+    assert protocol.decode_frame("bl 12 200") == (protocol.FRAME_BRIGHTNESS, 12, 200)
+    assert protocol.decode_frame("bs 3 1") == (protocol.FRAME_BUTTON, 3, 1)
+
+
+def test_decode_snapshot_frames():
+    """Snapshot frames hand over the unparsed body."""
+    assert protocol.decode_frame("lampData []") == (
+        protocol.FRAME_LAMP_DATA,
+        None,
+        " []",
+    )
+    assert protocol.decode_frame("buttonData {}") == (
+        protocol.FRAME_BUTTON_DATA,
+        None,
+        " {}",
+    )
+    assert protocol.decode_frame("pong") == (None, None, "pong")
+
+
+@pytest.mark.parametrize(
+    "message", ["bl 1", "bl x 1", "bl 1 99999", "bl 1 -1", "bs 1 256"]
+)
+def test_decode_malformed_push_frames(message):
+    """Malformed and out of range push frames raise ValueError."""
+    with pytest.raises(ValueError):
+        protocol.decode_frame(message)
+
+
+def test_decode_lamps():
+    """Null entries of unused lamp ids are kept as None."""
+    lamps = protocol.decode_lamps(
+        '[null, {"lampId": 1, "name": "Hall", "brightness": 80, "dimmable": 1}]'
+    )
+    assert lamps == [None, protocol.Lamp(1, "Hall", 80, 1)]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "not json",
+        '[{"name": "no id"}]',
+        '[{"lampId": 1, "name": "Hall", "brightness": 300}]',
+        '[{"lampId": 1, "name": "Hall", "dimmable": 5}]',
+    ],
+)
+def test_decode_malformed_lamps(body):
+    """Malformed lamp snapshots raise ProtocolError."""
+    with pytest.raises(protocol.ProtocolError):
+        protocol.decode_lamps(body)
+
+
+def test_decode_buttons():
+    """Buttons are keyed by their integer id."""
+    buttons = protocol.decode_buttons(
+        '{"4": {"buttonId": 4, "name": "Door", "state": 1}, "5": null}'
+    )
+    assert buttons == {4: protocol.Button(4, "Door", 1)}
+    with pytest.raises(protocol.ProtocolError):
+        protocol.decode_buttons('{"4": {"buttonId": 4, "name": "Door", "state": 999}}')
+
+
+def test_reply_key():
+    """Commands are answered by the echo of the lamp or the snapshot."""
+    assert protocol.reply_key("turn_on  5") == (protocol.FRAME_BRIGHTNESS, 5)
+    assert protocol.reply_key("set_brightness  5 100") == (protocol.FRAME_BRIGHTNESS, 5)
+    assert protocol.reply_key("getAllLamps") == (protocol.FRAME_LAMP_DATA, None)
+    assert protocol.reply_key("getAllButtons") == (protocol.FRAME_BUTTON_DATA, None)
+    assert protocol.reply_key("ping") is None
@@ -0,0 +1,98 @@
+"""Tests for the indexed state store."""
+from __future__ import annotations
+
+from conftest import load
+
+protocol = load("protocol")
+store = load("store")
+
+Lamp = protocol.Lamp
+Button = protocol.Button
+
+
+def test_apply_lamps_reports_changed_ids():
+    """Only lamps whose values changed get a new version."""
+    state = store.LightingLairdStateStore()
+    assert state.apply_lamps([None, Lamp(1, "Hall", 0), Lamp(2, "Desk", 10)]) == {
+        1,
+        2,
+    }
+    version = state.lamp_version(2)
+    assert state.apply_lamps([None, Lamp(1, "Hall", 50), Lamp(2, "Desk", 10)]) == {1}
+    assert state.lamp_version(2) == version
+    assert state.lamp_brightness(1) == 50
+
+
+def test_apply_lamps_records_inventory_changes():
+    """Added, removed and renamed lamps are recorded separately."""
+    state = store.LightingLairdStateStore()
+    state.apply_lamps([Lamp(1, "Hall", 0), Lamp(2, "Desk", 0)])
+
+    changes = store.InventoryChanges()
+    state.apply_lamps([Lamp(1, "Corridor", 0), Lamp(3, "Porch", 0)], changes)
+    assert changes.added == {3}
+    assert changes.removed == set()
+    assert changes.renamed == {1}
+    assert state.has_lamp(2)
+
+    changes = store.InventoryChanges()
+    state.apply_lamps([Lamp(1, "Corridor", 99), Lamp(3, "Porch", 0)], changes)
+    assert changes.removed == {2}
+    assert not state.has_lamp(2)
+    assert state.lamp_version(2) == -1
+
+    changes = store.InventoryChanges()
+    state.apply_lamps([Lamp(1, "Corridor", 99), Lamp(3, "Porch", 0)], changes)
+    assert not changes
+
+
+def test_apply_lamps_ignores_empty_and_truncated_snapshots():
+    """A lamp is kept unless it is missing from two snapshots in a row."""
+    state = store.LightingLairdStateStore()
+    state.apply_lamps([Lamp(1, "Hall", 0), Lamp(2, "Desk", 0)])
+
+    for _ in range(3):
+        changes = store.InventoryChanges()
+        assert state.apply_lamps([None], changes) == set()
+        assert not changes
+    assert state.lamp_ids() == [1, 2]
+
+    state.apply_lamps([Lamp(1, "Hall", 0)])
+    state.apply_lamps([Lamp(1, "Hall", 0), Lamp(2, "Desk", 0)])
+    state.apply_lamps([Lamp(1, "Hall", 0)])
+    assert state.has_lamp(2)
+
+
+def test_removed_slot_is_reused():
+    """The slot of a removed lamp is reused without stale values."""
+    state = store.LightingLairdStateStore()
+    state.apply_lamps([Lamp(1, "Hall", 200)])
+    state.apply_lamps([Lamp(7, "New", 0)])
+    state.apply_lamps([Lamp(7, "New", 0)])
+    state.apply_lamps([Lamp(8, "Newer", 0)])
+    state.apply_lamps([Lamp(8, "Newer", 0)])
+    assert state.lamp_ids() == [8]
+    assert state.lamp_brightness(8) == 0
+
+
+def test_set_lamp_brightness():
+    """Pushes only bump the version if the value changed."""
+    state = store.LightingLairdStateStore()
+    state.apply_lamps([Lamp(1, "Hall", 0)])
+    version = state.lamp_version(1)
+    assert state.set_lamp_brightness(1, 0) is False
+    assert state.set_lamp_brightness(1, 30) is True
+    assert state.lamp_version(1) == version + 1
+    assert state.set_lamp_brightness(9, 30) is False
+
+
+def test_apply_buttons():
+    """Buttons are diffed like lamps."""
+    state = store.LightingLairdStateStore()
+    changes = store.InventoryChanges()
+    state.apply_buttons([Button(1, "Door"), Button(2, "Gate")], changes)
+    assert changes.added == {1, 2}
+    assert state.apply_buttons([Button(1, "Door", 1), Button(2, "Gate")]) == {1}
+    assert state.button_state(1) == 1
+    assert state.set_button_state(2, 1) is True
+    assert state.button(2) == Button(2, "Gate", 1)
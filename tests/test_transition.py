@@ -0,0 +1,80 @@
+"""Tests for brightness commands issued during a transition."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import load, load_integration
+
+pytest.importorskip("homeassistant")
+
+lighting_laird = load_integration()
+protocol = load("protocol")
+
+
+class _Hass:
+    """The parts of Home Assistant used by the lamp commands of the API."""
+
+    def __init__(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.data = {}
+
+    def async_create_task(self, target, *args, **kwargs):
+        return self.loop.create_task(target)
+
+
+class _Server:
+    """Connection which acknowledges every command right away."""
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def add_frame_handler(self, handler):
+        return lambda: None
+
+    async def sendMsg(self, msg, priority=None):
+        self.sent.append(msg)
+
+
+async def _ramping_api():
+    """Return an API whose lamp 1 is half way through a transition to 254."""
+    server = _Server()
+    api = lighting_laird.LightingLairdIntegrationApi(_Hass())
+    api.coordinator = SimpleNamespace()
+    api.async_setup(SimpleNamespace(entry_id="entry"), SimpleNamespace(server=server))
+    api.store.apply_lamps([None, protocol.Lamp(1, "Hall", 0)])
+    api.async_start_transition(1, 254, 1)
+    await asyncio.sleep(0.5)
+    assert server.sent
+    return api, server
+
+
+def test_brightness_change_cancels_transition():
+    """A new brightness ends the ramp, its level is the one which stays."""
+
+    async def run():
+        api, server = await _ramping_api()
+        await api.async_update_value(1, 40)
+        assert api.brightness_target(1) == 101
+        await asyncio.sleep(1)
+        assert server.sent[-1] == "set_brightness  1 101"
+        assert api.brightness_target(1) == 101
+        api.shutdown()
+
+    asyncio.run(run())
+
+
+def test_turn_off_cancels_transition():
+    """Turning the lamp off without a transition ends the ramp as well."""
+
+    async def run():
+        api, server = await _ramping_api()
+        await api.async_update_state(1, False)
+        await asyncio.sleep(1)
+        assert server.sent[-1] == "turn_off  1"
+        assert api.brightness_target(1) == 0
+        api.shutdown()
+
+    asyncio.run(run())